@@ -0,0 +1,51 @@
+"""Add indexes for ETL lookups
+
+Revision ID: 0002_creditor_lookup_indexes
+Revises: 0001_initial
+Create Date: 2026-10-15 09:00:00
+"""
+
+from alembic import op
+
+# Lowest supplier id per name: the row kept when duplicate names are merged
+CANONICAL_SUPPLIER_IDS = "SELECT MIN(id) FROM suppliers GROUP BY name"
+
+# revision identifiers, used by Alembic.
+revision = "0002_creditor_lookup_indexes"
+down_revision = "0001_initial"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Serves both the (supplier_id, invoice_date, amount) bank-statement
+    # idempotency lookup and the (supplier_id, invoice_date) aging upsert
+    # lookup, which uses the leading two columns.
+    op.create_index(
+        "ix_creditors_supplier_invoice_amount",
+        "creditors",
+        ["supplier_id", "invoice_date", "amount"],
+    )
+    # suppliers.name was not unique before this revision, so merge duplicate
+    # names into their lowest id before the unique index is created. Only
+    # creditors reference suppliers by id; rule_changes name them in nl_text.
+    op.execute(
+        f"""
+        UPDATE creditors
+        SET supplier_id = (
+            SELECT MIN(canonical.id)
+            FROM suppliers AS duplicate
+            JOIN suppliers AS canonical ON canonical.name = duplicate.name
+            WHERE duplicate.id = creditors.supplier_id
+        )
+        WHERE supplier_id NOT IN ({CANONICAL_SUPPLIER_IDS})
+        """
+    )
+    op.execute(f"DELETE FROM suppliers WHERE id NOT IN ({CANONICAL_SUPPLIER_IDS})")
+    op.create_index("ix_suppliers_name", "suppliers", ["name"], unique=True)
+
+
+def downgrade():
+    # Merged duplicate suppliers are not restored
+    op.drop_index("ix_suppliers_name", table_name="suppliers")
+    op.drop_index("ix_creditors_supplier_invoice_amount", table_name="creditors")
@@ -0,0 +1,56 @@
+"""Fixed precision amounts and JSONB forecasts
+
+Revision ID: 0003_amount_precision
+Revises: 0002_creditor_lookup_indexes
+Create Date: 2026-10-15 10:00:00
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0003_amount_precision"
+down_revision = "0002_creditor_lookup_indexes"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for table in ("creditors", "payment_plans"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "amount",
+                existing_type=sa.Numeric(),
+                type_=sa.Numeric(14, 2),
+                existing_nullable=False,
+            )
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            "forecasts",
+            "forecast_json",
+            existing_type=sa.JSON(),
+            type_=postgresql.JSONB(),
+            existing_nullable=False,
+            postgresql_using="forecast_json::jsonb",
+        )
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "postgresql":
+        op.alter_column(
+            "forecasts",
+            "forecast_json",
+            existing_type=postgresql.JSONB(),
+            type_=sa.JSON(),
+            existing_nullable=False,
+            postgresql_using="forecast_json::json",
+        )
+    for table in ("payment_plans", "creditors"):
+        with op.batch_alter_table(table) as batch_op:
+            batch_op.alter_column(
+                "amount",
+                existing_type=sa.Numeric(14, 2),
+                type_=sa.Numeric(),
+                existing_nullable=False,
+            )
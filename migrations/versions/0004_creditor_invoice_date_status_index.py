@@ -0,0 +1,26 @@
+"""Add index for daily net-cash aggregation
+
+Revision ID: 0004_creditor_invoice_date_status_index
+Revises: 0003_amount_precision
+Create Date: 2026-10-15 12:00:00
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0004_creditor_invoice_date_status_index"
+down_revision = "0003_amount_precision"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_creditors_invoice_date_status",
+        "creditors",
+        ["invoice_date", "status"],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_creditors_invoice_date_status", table_name="creditors")
@@ -0,0 +1,27 @@
+"""Add descending run_date index on forecasts
+
+Revision ID: 0005_forecast_run_date_index
+Revises: 0004_creditor_invoice_date_status_index
+Create Date: 2026-10-15 13:00:00
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0005_forecast_run_date_index"
+down_revision = "0004_creditor_invoice_date_status_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_forecasts_run_date_desc",
+        "forecasts",
+        [sa.text("run_date DESC")],
+    )
+
+
+def downgrade():
+    op.drop_index("ix_forecasts_run_date_desc", table_name="forecasts")
@@ -0,0 +1,44 @@
+"""Flag draft payment plans with an indexed column
+
+Revision ID: 0006_payment_plan_is_draft
+Revises: 0005_forecast_run_date_index
+Create Date: 2026-10-15 14:00:00
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0006_payment_plan_is_draft"
+down_revision = "0005_forecast_run_date_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "payment_plans",
+        sa.Column("is_draft", sa.Boolean(), nullable=False, server_default=sa.false()),
+    )
+    # Drafts were previously identified by their note text
+    payment_plans = sa.table(
+        "payment_plans", sa.column("note", sa.Text), sa.column("is_draft", sa.Boolean)
+    )
+    op.execute(
+        payment_plans.update()
+        .where(sa.func.lower(payment_plans.c.note).like("%draft%"))
+        .values(is_draft=True)
+    )
+    op.create_index(
+        "ix_payment_plans_draft",
+        "payment_plans",
+        ["scheduled_date"],
+        postgresql_where=sa.text("is_draft"),
+        sqlite_where=sa.text("is_draft"),
+    )
+
+
+def downgrade():
+    op.drop_index("ix_payment_plans_draft", table_name="payment_plans")
+    with op.batch_alter_table("payment_plans") as batch_op:
+        batch_op.drop_column("is_draft")
@@ -0,0 +1,37 @@
+"""Add partial index over pending rule changes
+
+Revision ID: 0007_rule_changes_pending_index
+Revises: 0006_payment_plan_is_draft
+Create Date: 2026-10-15 15:00:00
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0007_rule_changes_pending_index"
+down_revision = "0006_payment_plan_is_draft"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # CONCURRENTLY cannot run inside a transaction block on PostgreSQL
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_rule_changes_pending",
+            "rule_changes",
+            ["id"],
+            postgresql_where=sa.text("applied = false"),
+            postgresql_concurrently=True,
+            sqlite_where=sa.text("applied = 0"),
+        )
+
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            "ix_rule_changes_pending",
+            table_name="rule_changes",
+            postgresql_concurrently=True,
+        )
@@ -1,25 +1,25 @@
 #!/usr/bin/env python
 """Test runner for the Cashflow Forecast application."""
 
-import unittest
+import importlib.util
 import sys
 import os
 
+import pytest
+
 def run_tests():
-    """Discover and run all tests in the tests directory."""
+    """Discover and run all tests in the tests directory with pytest."""
     # Add the project root to the Python path
     sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
-    
-    # Discover and run tests
-    test_loader = unittest.TestLoader()
-    test_suite = test_loader.discover('tests', pattern='test_*.py')
-    
-    # Run tests with verbosity
-    runner = unittest.TextTestRunner(verbosity=2)
-    result = runner.run(test_suite)
-    
-    # Return exit code based on test results
-    return 0 if result.wasSuccessful() else 1
+
+    # Stop at the first failure; fan test files out over all cores when
+    # pytest-xdist is installed, keeping each file's tests on one worker
+    args = ["-x", "-q", "tests"]
+    if importlib.util.find_spec("xdist") is not None:
+        args += ["-n", "auto", "--dist=loadfile"]
+
+    # Return pytest's exit code
+    return int(pytest.main(args))
 
 if __name__ == '__main__':
     sys.exit(run_tests())
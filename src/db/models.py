@@ -4,23 +4,26 @@ This module defines the SQLAlchemy models:
 Supplier, Creditor, RuleChange, PaymentPlan, and Forecast.
 """
 
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Optional
+
 from sqlalchemy import (
-    Column,
-    Integer,
     String,
     Enum,
-    Date,
-    DateTime,
     Numeric,
-    Boolean,
     Text,
     JSON,
     ForeignKey,
+    Index,
 )
-from sqlalchemy.sql import func
-from sqlalchemy.ext.declarative import declarative_base
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+from sqlalchemy.sql import false, func, text
+
 
-Base = declarative_base()
+class Base(DeclarativeBase):
+    """Declarative base class shared by all ORM models."""
 
 
 class Supplier(Base):
@@ -34,10 +37,10 @@ class Supplier(Base):
     """
 
     __tablename__ = "suppliers"
-    id = Column(Integer, primary_key=True, index=True)
-    name = Column(String, nullable=False)
-    type = Column(Enum("core", "flex", name="supplier_type"), nullable=False)
-    max_delay_days = Column(Integer, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    name: Mapped[str] = mapped_column(String, unique=True, index=True)
+    type: Mapped[str] = mapped_column(Enum("core", "flex", name="supplier_type"))
+    max_delay_days: Mapped[int]
 
 
 class Creditor(Base):
@@ -49,20 +52,31 @@ class Creditor(Base):
         invoice_date (date): Date of the invoice.
         due_date (date): Due date of the invoice.
         amount (Decimal): Amount due or credited.
-        aging_days (int): Days past due.
+        aging_days (int): Days past due. Stored by the ETL at load time: CSV
+            values may override it, and a generated column cannot use the
+            non-immutable CURRENT_DATE.
         status (str): 'credit' or 'payment'.
     """
 
     __tablename__ = "creditors"
-    id = Column(Integer, primary_key=True, index=True)
-    supplier_id = Column(
-        Integer, ForeignKey("suppliers.id"), nullable=False, index=True
+    __table_args__ = (
+        # Covers ETL idempotency/upsert lookups by (supplier_id, invoice_date[, amount])
+        Index(
+            "ix_creditors_supplier_invoice_amount",
+            "supplier_id",
+            "invoice_date",
+            "amount",
+        ),
+        # Lets the daily net-cash aggregation stream over invoice_date
+        Index("ix_creditors_invoice_date_status", "invoice_date", "status"),
     )
-    invoice_date = Column(Date, nullable=False)
-    due_date = Column(Date, nullable=False)
-    amount = Column(Numeric, nullable=False)
-    aging_days = Column(Integer, nullable=False)
-    status = Column(String, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    supplier_id: Mapped[int] = mapped_column(ForeignKey("suppliers.id"), index=True)
+    invoice_date: Mapped[date]
+    due_date: Mapped[date]
+    amount: Mapped[Decimal] = mapped_column(Numeric(14, 2))
+    aging_days: Mapped[int]
+    status: Mapped[str] = mapped_column(String)
 
 
 class RuleChange(Base):
@@ -76,10 +90,20 @@ class RuleChange(Base):
     """
 
     __tablename__ = "rule_changes"
-    id = Column(Integer, primary_key=True, index=True)
-    nl_text = Column(Text, nullable=False)
-    applied = Column(Boolean, default=False, nullable=False)
-    created_at = Column(DateTime, server_default=func.now(), nullable=False)
+    # Partial index over pending rules only; predicates match how each dialect
+    # renders RuleChange.applied == False
+    __table_args__ = (
+        Index(
+            "ix_rule_changes_pending",
+            "id",
+            postgresql_where=text("applied = false"),
+            sqlite_where=text("applied = 0"),
+        ),
+    )
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    nl_text: Mapped[str] = mapped_column(Text)
+    applied: Mapped[bool] = mapped_column(default=False)
+    created_at: Mapped[datetime] = mapped_column(server_default=func.now())
 
 
 class PaymentPlan(Base):
@@ -91,16 +115,25 @@ class PaymentPlan(Base):
         scheduled_date (date): Scheduled payment date.
         amount (Decimal): Payment amount.
         note (str): Notes on the payment plan.
+        is_draft (bool): Whether the plan is a draft, replaced on each draft save.
     """
 
     __tablename__ = "payment_plans"
-    id = Column(Integer, primary_key=True, index=True)
-    creditor_id = Column(
-        Integer, ForeignKey("creditors.id"), nullable=False, index=True
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    creditor_id: Mapped[int] = mapped_column(ForeignKey("creditors.id"), index=True)
+    scheduled_date: Mapped[date]
+    amount: Mapped[Decimal] = mapped_column(Numeric(14, 2))
+    note: Mapped[Optional[str]] = mapped_column(Text)
+    is_draft: Mapped[bool] = mapped_column(default=False, server_default=false())
+    # Partial index: drafts are a small slice of plans and are looked up as a set
+    __table_args__ = (
+        Index(
+            "ix_payment_plans_draft",
+            "scheduled_date",
+            postgresql_where=text("is_draft"),
+            sqlite_where=text("is_draft"),
+        ),
     )
-    scheduled_date = Column(Date, nullable=False)
-    amount = Column(Numeric, nullable=False)
-    note = Column(Text)
 
 
 class Forecast(Base):
@@ -110,11 +143,13 @@ class Forecast(Base):
         id (int): Primary key.
         run_date (datetime): Timestamp of when forecast was generated.
         horizon_days (int): Forecast horizon in days.
-        forecast_json (JSON): JSON payload of forecast results.
+        forecast_json (JSON): JSON payload of forecast results (JSONB on PostgreSQL).
     """
 
     __tablename__ = "forecasts"
-    id = Column(Integer, primary_key=True, index=True)
-    run_date = Column(DateTime, nullable=False)
-    horizon_days = Column(Integer, nullable=False)
-    forecast_json = Column(JSON, nullable=False)
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+    run_date: Mapped[datetime] = mapped_column()
+    # Latest-forecast lookups (ORDER BY run_date DESC LIMIT 1) seek the first entry
+    __table_args__ = (Index("ix_forecasts_run_date_desc", run_date.desc()),)
+    horizon_days: Mapped[int]
+    forecast_json: Mapped[Any] = mapped_column(JSON().with_variant(JSONB(), "postgresql"))
@@ -1,7 +1,12 @@
 """ETL pipeline: CSV ingestion -> database."""
 
-from typing import List, Tuple
+import io
+from datetime import date
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, TypeVar
+import numpy as np
 import pandas as pd
+from sqlalchemy import bindparam, insert, select, update
 from sqlalchemy.orm import Session
 
 from src.logging_config import get_logger
@@ -11,29 +16,391 @@ from src.db.models import Supplier, Creditor
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Rows sent per executemany round-trip when bulk-writing creditors
+INSERT_BATCH_SIZE = 1000
+
+# Rows read from a CSV and committed per page
+PAGE_SIZE = 5000
+
+# Creditors-aging CSV columns read by the ETL; any others are skipped
+AGING_COLUMNS = (
+    "supplier",
+    "description",
+    "invoice_date",
+    "due_date",
+    "amount",
+    "aging_days",
+    "status",
+)
+
+# Column order used when streaming new creditors through PostgreSQL COPY
+CREDITOR_COPY_COLUMNS = (
+    "supplier_id",
+    "invoice_date",
+    "due_date",
+    "amount",
+    "aging_days",
+    "status",
+)
+
+# Lookup statements built once at import; SQLAlchemy's compiled cache then
+# reuses their SQL string on every call instead of rebuilding the query.
+SUPPLIER_IDS_BY_NAME = select(Supplier.name, Supplier.id)
+CREDITOR_KEYS_BY_SUPPLIER = select(
+    Creditor.supplier_id, Creditor.invoice_date, Creditor.amount
+).where(Creditor.supplier_id.in_(bindparam("supplier_ids", expanding=True)))
+CREDITOR_IDS_BY_SUPPLIER = select(
+    Creditor.id, Creditor.supplier_id, Creditor.invoice_date
+).where(Creditor.supplier_id.in_(bindparam("supplier_ids", expanding=True)))
+
+
+def standardize_columns(columns: pd.Index) -> pd.Index:
+    """Normalize CSV column names to stripped, lower-case snake_case.
 
-def get_or_create_supplier(db: Session, name: str) -> Supplier:
-    """Get or create a Supplier in the database by name.
+    Args:
+        columns (pd.Index): Raw column names from the CSV header.
+
+    Returns:
+        pd.Index: Standardized column names.
+    """
+    return columns.str.strip().str.lower().str.replace(" ", "_")
+
+
+def load_supplier_cache(db: Session) -> Dict[str, int]:
+    """Load the full supplier table as a name -> id mapping in a single query.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+
+    Returns:
+        Dict[str, int]: Mapping of supplier name to supplier id.
+    """
+    return dict(db.execute(SUPPLIER_IDS_BY_NAME).all())
+
+
+def create_missing_suppliers(
+    db: Session, supplier_cache: Dict[str, int], names: Iterable[str]
+) -> None:
+    """Insert suppliers not yet present in supplier_cache with one batched INSERT.
+
+    The cache is updated in place with the ids of the newly created suppliers.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        supplier_cache (Dict[str, int]): Mapping of supplier name to supplier id.
+        names (Iterable[str]): Supplier names referenced by the incoming rows.
+
+    Returns:
+        None
+    """
+    new_names = set(names) - supplier_cache.keys()
+    if not new_names:
+        return
+
+    result = db.execute(
+        insert(Supplier).returning(Supplier.name, Supplier.id),
+        [{"name": name, "type": "core", "max_delay_days": 0} for name in sorted(new_names)],
+    )
+    supplier_cache.update(result.tuples().all())
+    logger.info(f"Created {len(new_names)} suppliers")
+
+
+def normalize_supplier_names(names: pd.Series) -> pd.Series:
+    """Strip supplier names, normalizing each distinct value only once.
+
+    Args:
+        names (pd.Series): Raw supplier name column.
+
+    Returns:
+        pd.Series: Stripped names aligned with names; missing values become "".
+    """
+    codes, uniques = pd.factorize(names)
+    stripped = pd.Index(uniques, dtype=object).astype(str).str.strip().to_numpy(dtype=object)
+    # Missing values are coded -1, which picks the trailing "" sentinel
+    return pd.Series(np.append(stripped, "")[codes], index=names.index)
+
+
+def resolve_supplier_ids(
+    db: Session, supplier_cache: Dict[str, int], names: pd.Series
+) -> np.ndarray:
+    """Map supplier names to ids, touching each distinct name only once.
+
+    Unknown suppliers are created in a single batch via create_missing_suppliers.
 
     Args:
         db (Session): SQLAlchemy Session object.
-        name (str): Name of the supplier.
+        supplier_cache (Dict[str, int]): Mapping of supplier name to supplier id.
+        names (pd.Series): Normalized, non-empty supplier names.
 
     Returns:
-        Supplier: The existing or newly created Supplier instance.
+        np.ndarray: Supplier id for each entry in names.
     """
-    supplier = db.query(Supplier).filter_by(name=name).first()
-    if not supplier:
-        supplier = Supplier(name=name, type="core", max_delay_days=0)
-        db.add(supplier)
-        db.flush()
-        logger.info(f"Created supplier: {name}")
-    return supplier
+    codes, uniques = pd.factorize(names)
+    create_missing_suppliers(db, supplier_cache, uniques)
+    unique_ids = np.fromiter(
+        (supplier_cache[name] for name in uniques), dtype=np.int64, count=len(uniques)
+    )
+    return unique_ids[codes]
+
+
+def load_existing_creditor_keys(
+    db: Session, supplier_ids: Iterable[int]
+) -> Set[Tuple[int, date, float]]:
+    """Load (supplier_id, invoice_date, amount) keys of existing creditors in one query.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        supplier_ids (Iterable[int]): Supplier ids to scope the lookup to.
+
+    Returns:
+        Set[Tuple[int, date, float]]: Keys of creditors already stored.
+    """
+    rows = db.execute(CREDITOR_KEYS_BY_SUPPLIER, {"supplier_ids": list(supplier_ids)}).all()
+    return {(supplier_id, invoice_date, float(amount)) for supplier_id, invoice_date, amount in rows}
+
+
+def execute_in_batches(db: Session, statement, rows: List[dict]) -> None:
+    """Execute a Core insert/update statement over rows in executemany batches.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        statement: SQLAlchemy Core statement to execute for each batch.
+        rows (List[dict]): Parameter dictionaries, one per row.
+
+    Returns:
+        None
+    """
+    for start in range(0, len(rows), INSERT_BATCH_SIZE):
+        db.execute(statement, rows[start:start + INSERT_BATCH_SIZE])
+
+
+def copy_creditors(db: Session, rows: List[dict]) -> None:
+    """Bulk-load creditor rows through PostgreSQL COPY FROM STDIN.
+
+    Args:
+        db (Session): SQLAlchemy Session object bound to a psycopg2 engine.
+        rows (List[dict]): Creditor rows keyed by CREDITOR_COPY_COLUMNS.
+
+    Returns:
+        None
+    """
+    buffer = io.StringIO()
+    pd.DataFrame(rows, columns=list(CREDITOR_COPY_COLUMNS)).to_csv(
+        buffer, index=False, header=False
+    )
+    buffer.seek(0)
+
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            f"COPY {Creditor.__tablename__} ({', '.join(CREDITOR_COPY_COLUMNS)}) "
+            "FROM STDIN WITH (FORMAT csv)",
+            buffer,
+        )
+    finally:
+        cursor.close()
+
+
+def insert_creditors(db: Session, rows: List[dict]) -> None:
+    """Insert new creditor rows, using COPY on PostgreSQL and batched INSERTs elsewhere.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        rows (List[dict]): Creditor rows keyed by CREDITOR_COPY_COLUMNS.
+
+    Returns:
+        None
+    """
+    if not rows:
+        return
+    dialect = db.get_bind().dialect
+    if dialect.name == "postgresql" and dialect.driver == "psycopg2":
+        copy_creditors(db, rows)
+    else:
+        execute_in_batches(db, insert(Creditor.__table__), rows)
+
+
+def transform_bank_statement_page(
+    df: pd.DataFrame,
+    date_col: str,
+    amount_col: str,
+    supplier_col: str,
+    today: pd.Timestamp,
+) -> pd.DataFrame:
+    """Validate and transform one page of a bank statement CSV without touching the database.
+
+    Args:
+        df (pd.DataFrame): Page of the CSV with standardized column names.
+        date_col (str): Name of the transaction date column.
+        amount_col (str): Name of the amount column.
+        supplier_col (str): Name of the supplier/description column.
+        today (pd.Timestamp): Normalized current date used for aging_days.
+
+    Returns:
+        pd.DataFrame: Valid rows with columns supplier_name, invoice_date, due_date,
+            amount, aging_days and status.
+    """
+    # Vectorized validation: coerce whole columns, then mask out invalid rows
+    dates = pd.to_datetime(df[date_col], errors="coerce").dt.normalize()
+    amounts = pd.to_numeric(df[amount_col], errors="coerce").round(2)
+    invalid_amounts = int(amounts.isna().sum())
+    if invalid_amounts:
+        logger.warning(f"Dropping {invalid_amounts} bank statement rows with invalid amounts")
+    supplier_names = normalize_supplier_names(df[supplier_col])
+    valid = (
+        dates.notna()
+        & amounts.notna()
+        & (amounts != 0)
+        & (supplier_names.str.len() > 0)
+    )
+    if not valid.all():
+        logger.warning(f"Skipping {int((~valid).sum())} invalid bank statement rows")
+
+    dates = dates[valid]
+    amounts = amounts[valid]
+    return pd.DataFrame(
+        {
+            "supplier_name": supplier_names[valid],
+            "invoice_date": dates.dt.date,
+            "due_date": dates.dt.date,  # Default due date to invoice date
+            "amount": amounts,
+            "aging_days": (today - dates).dt.days,
+            "status": np.where(amounts > 0, "credit", "payment"),
+        }
+    )
+
+
+def ingest_bank_statement_page(
+    db: Session, page: pd.DataFrame, supplier_cache: Dict[str, int]
+) -> int:
+    """Load one transformed page of a bank statement CSV into the creditors table.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        page (pd.DataFrame): Output of transform_bank_statement_page.
+        supplier_cache (Dict[str, int]): Mapping of supplier name to supplier id.
+
+    Returns:
+        int: Number of new records inserted.
+    """
+    # Resolve supplier ids, creating unknown suppliers in one batch
+    supplier_ids = resolve_supplier_ids(db, supplier_cache, page["supplier_name"])
+
+    # Idempotency: prefetch existing keys for the suppliers in this page
+    existing_keys = load_existing_creditor_keys(db, np.unique(supplier_ids).tolist())
+
+    rows = page.drop(columns="supplier_name").assign(supplier_id=supplier_ids).to_dict("records")
+
+    insert_rows = []
+    for row in rows:
+        # Idempotency: skip existing record
+        key = (row["supplier_id"], row["invoice_date"], row["amount"])
+        if key in existing_keys:
+            continue
+        existing_keys.add(key)
+        insert_rows.append(row)
+
+    insert_creditors(db, insert_rows)
+    return len(insert_rows)
+
+
+def read_csv_header(source) -> pd.Index:
+    """Read only the header row of a CSV.
+
+    File-like sources (such as Streamlit uploads) are rewound afterwards so the
+    body can then be streamed from the start.
+
+    Args:
+        source: File path or readable, seekable buffer.
+
+    Returns:
+        pd.Index: Raw column names.
+    """
+    header = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return header
+
+
+def read_bank_statement_pages(path: str, today: pd.Timestamp) -> Iterator[pd.DataFrame]:
+    """Stream a bank statement CSV as transformed pages of PAGE_SIZE rows.
+
+    Args:
+        path (str): File path to the bank statement CSV.
+        today (pd.Timestamp): Normalized current date used for aging_days.
+
+    Yields:
+        pd.DataFrame: Transformed rows of each page.
+    """
+    # Probe the header to resolve the schema before streaming the body
+    header = read_csv_header(path)
+    columns = standardize_columns(header)
+    raw_names = dict(zip(columns, header))
+
+    # Determine key columns
+    date_col = next((c for c in columns if "date" in c), None)
+    amount_col = next((c for c in columns if "amount" in c), None)
+    supplier_col = next(
+        (c for c in columns if "supplier" in c or "description" in c), None
+    )
+
+    if not (date_col and amount_col and supplier_col):
+        logger.warning(f"Skipping {path}: required columns missing. Found columns: {columns.tolist()}")
+        return
+
+    # Only parse the three columns used downstream
+    reader = pd.read_csv(
+        path,
+        chunksize=PAGE_SIZE,
+        usecols=[raw_names[col] for col in (date_col, amount_col, supplier_col)],
+        dtype={raw_names[supplier_col]: "string"},
+        parse_dates=[raw_names[date_col]],
+    )
+    rows_read = 0
+    for df in reader:
+        rows_read += len(df)
+        df.columns = standardize_columns(df.columns)
+        yield transform_bank_statement_page(
+            df, date_col, amount_col, supplier_col, today
+        )
+
+    if rows_read == 0:
+        logger.warning(f"Empty CSV file: {path}")
+
+
+def prefetch(items: Iterator[T]) -> Iterator[T]:
+    """Advance items one step ahead on a worker thread while the caller consumes.
+
+    Lets CSV parsing and transformation (largely GIL-releasing pandas code) of
+    the next page overlap with database writes for the current one, while the
+    session itself is only ever used from the calling thread.
+
+    Args:
+        items (Iterator[T]): Iterator to read ahead from.
+
+    Yields:
+        T: Items of the iterator, in order.
+    """
+    done = object()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        pending = executor.submit(next, items, done)
+        while True:
+            item = pending.result()
+            if item is done:
+                return
+            pending = executor.submit(next, items, done)
+            yield item
 
 
 def ingest_bank_statements(db: Session, bank_csv_paths: List[str]) -> int:
     """Ingest bank statement CSVs and load credit/payment transactions into creditors table.
 
+    Each CSV is read in pages of PAGE_SIZE rows and committed page by page, so memory
+    stays bounded and completed pages survive a failure later in the file. The next
+    page is parsed on a worker thread while the current one is written.
+
     Args:
         db (Session): SQLAlchemy Session object.
         bank_csv_paths (List[str]): List of file paths to bank statement CSVs.
@@ -47,108 +414,147 @@ def ingest_bank_statements(db: Session, bank_csv_paths: List[str]) -> int:
         logger.warning("No bank statement CSV paths provided")
         return inserted
 
+    today = pd.Timestamp.now().normalize()
+    supplier_cache = load_supplier_cache(db)
+
     for path in bank_csv_paths:
         try:
-            # Read CSV file
-            df = pd.read_csv(path)
-            if df.empty:
-                logger.warning(f"Empty CSV file: {path}")
-                continue
-
-            # Standardize column names
-            df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
-
-            # Determine key columns
-            date_col = next((c for c in df.columns if "date" in c), None)
-            amount_col = next((c for c in df.columns if "amount" in c), None)
-            supplier_col = next(
-                (c for c in df.columns if "supplier" in c or "description" in c), None
-            )
-
-            if not (date_col and amount_col and supplier_col):
-                logger.warning(f"Skipping {path}: required columns missing. Found columns: {df.columns.tolist()}")
-                continue
-
-            # Normalize date columns to datetime.date
-            try:
-                df[date_col] = pd.to_datetime(df[date_col], errors='coerce').dt.date
-                # Drop rows with invalid dates
-                df = df.dropna(subset=[date_col])
-            except Exception as e:
-                logger.error(f"Error converting dates in {path}: {e}")
-                continue
-
-            # Process each row
-            for _, row in df.iterrows():
-                try:
-                    date = row[date_col]
-
-                    # Skip rows with missing dates
-                    if pd.isna(date):
-                        continue
-
-                    # Validate and convert amount
-                    try:
-                        amount = float(row[amount_col])
-                    except (ValueError, TypeError):
-                        logger.warning(f"Invalid amount value: {row[amount_col]}")
-                        continue
-
-                    if pd.isna(amount) or amount == 0:
-                        continue
-
-                    status = "credit" if amount > 0 else "payment"
-
-                    # Validate supplier name
-                    supplier_name = str(row[supplier_col]).strip()
-                    if not supplier_name:
-                        continue
-
-                    # Get or create supplier
-                    supplier = get_or_create_supplier(db, supplier_name)
-
-                    # Idempotency: skip existing record
-                    existing = (
-                        db.query(Creditor)
-                        .filter_by(supplier_id=supplier.id, invoice_date=date, amount=amount)
-                        .first()
-                    )
-                    if existing:
-                        continue
-
-                    # Calculate aging days
-                    try:
-                        aging_days = (pd.Timestamp.now().date() - date).days
-                    except Exception:
-                        aging_days = 0
-
-                    # Create new creditor record
-                    creditor = Creditor(
-                        supplier_id=supplier.id,
-                        invoice_date=date,
-                        due_date=date,  # Default due date to invoice date
-                        amount=amount,
-                        aging_days=aging_days,
-                        status=status,
-                    )
-                    db.add(creditor)
-                    inserted += 1
-                except Exception as e:
-                    logger.exception(f"Error processing row in {path}: {e}")
-                    continue
+            for page in prefetch(read_bank_statement_pages(path, today)):
+                inserted += ingest_bank_statement_page(db, page, supplier_cache)
+                db.commit()
+                db.expunge_all()
 
         except Exception as e:
             logger.exception(f"Error processing bank statement CSV {path}: {e}")
+            # Discard the failed page; suppliers created in it were rolled back too
+            db.rollback()
+            supplier_cache = load_supplier_cache(db)
             continue
 
-    db.commit()
     logger.info(f"Inserted {inserted} records from bank statements")
     return inserted
 
 
+def ingest_creditors_aging_page(
+    db: Session,
+    df: pd.DataFrame,
+    supplier_cache: Dict[str, int],
+    today: pd.Timestamp,
+) -> Tuple[int, int]:
+    """Insert or update creditors from one page of a creditors-aging CSV.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+        df (pd.DataFrame): Page of the CSV with standardized column names.
+        supplier_cache (Dict[str, int]): Mapping of supplier name to supplier id.
+        today (pd.Timestamp): Normalized current date used for aging_days.
+
+    Returns:
+        Tuple[int, int]: Tuple of (inserted_count, updated_count).
+    """
+    inserted = 0
+    updated = 0
+
+    # Vectorized validation: coerce whole columns, then mask out invalid rows
+    invoice_dates = pd.to_datetime(df["invoice_date"], errors="coerce").dt.normalize()
+    if "due_date" in df.columns:
+        due_dates = pd.to_datetime(df["due_date"], errors="coerce").dt.normalize()
+        due_dates = due_dates.fillna(invoice_dates)
+    else:
+        due_dates = invoice_dates
+
+    amounts = pd.to_numeric(df["amount"], errors="coerce").round(2)
+    invalid_amounts = int(amounts.isna().sum())
+    if invalid_amounts:
+        logger.warning(f"Dropping {invalid_amounts} creditors-aging rows with invalid amounts")
+
+    # Calculate aging days only where not provided or not numeric
+    if "aging_days" in df.columns:
+        aging_days = pd.to_numeric(df["aging_days"], errors="coerce")
+        missing_aging = aging_days.isna()
+        if missing_aging.any():
+            aging_days = aging_days.fillna((today - invoice_dates[missing_aging]).dt.days)
+    else:
+        aging_days = (today - invoice_dates).dt.days
+
+    # Default status to "payment" when blank
+    if "status" in df.columns:
+        statuses = df["status"].fillna("").astype(str).str.strip()
+        statuses = statuses.mask(statuses == "", "payment")
+    else:
+        statuses = pd.Series("payment", index=df.index)
+
+    # Supplier name falls back to the description column
+    supplier_names = pd.Series("", index=df.index)
+    for col in ("description", "supplier"):
+        if col in df.columns:
+            names = normalize_supplier_names(df[col])
+            supplier_names = names.mask(names == "", supplier_names)
+
+    missing_supplier = supplier_names.str.len() == 0
+    if missing_supplier.any():
+        logger.warning(f"Skipping {int(missing_supplier.sum())} rows with missing supplier name")
+    valid = invoice_dates.notna() & amounts.notna() & ~missing_supplier
+
+    # Resolve supplier ids, creating unknown suppliers in one batch
+    supplier_ids = resolve_supplier_ids(db, supplier_cache, supplier_names[valid])
+
+    rows = pd.DataFrame(
+        {
+            "supplier_id": supplier_ids,
+            "invoice_date": invoice_dates[valid].dt.date,
+            "due_date": due_dates[valid].dt.date,
+            "amount": amounts[valid],
+            "aging_days": aging_days[valid].astype(int),
+            "status": statuses[valid],
+        }
+    ).to_dict("records")
+
+    # Prefetch ids of existing creditors for the suppliers in this page
+    existing_ids = {
+        (supplier_id, invoice_date): creditor_id
+        for creditor_id, supplier_id, invoice_date in db.execute(
+            CREDITOR_IDS_BY_SUPPLIER, {"supplier_ids": np.unique(supplier_ids).tolist()}
+        ).all()
+    }
+
+    # Split rows into inserts and updates; later rows win for duplicate keys
+    insert_rows: Dict[Tuple[int, date], dict] = {}
+    update_rows: Dict[Tuple[int, date], dict] = {}
+    for row in rows:
+        key = (row["supplier_id"], row["invoice_date"])
+        creditor_id = existing_ids.get(key)
+        if creditor_id is not None:
+            update_rows[key] = {
+                "_id": creditor_id,
+                "due_date": row["due_date"],
+                "amount": row["amount"],
+                "aging_days": row["aging_days"],
+                "status": row["status"],
+            }
+            updated += 1
+        elif key in insert_rows:
+            insert_rows[key] = row
+            updated += 1
+        else:
+            insert_rows[key] = row
+            inserted += 1
+
+    insert_creditors(db, list(insert_rows.values()))
+    execute_in_batches(
+        db,
+        update(Creditor.__table__).where(Creditor.__table__.c.id == bindparam("_id")),
+        list(update_rows.values()),
+    )
+    return inserted, updated
+
+
 def ingest_creditors_aging(db: Session, aging_csv_path: str) -> Tuple[int, int]:
     """Ingest creditors-aging CSV and insert or update creditors.
 
+    The CSV is read in pages of PAGE_SIZE rows and committed page by page; the next
+    page is parsed on a worker thread while the current one is written.
+
     Args:
         db (Session): SQLAlchemy Session object.
         aging_csv_path (str): File path to the creditors-aging CSV.
@@ -163,112 +569,57 @@ def ingest_creditors_aging(db: Session, aging_csv_path: str) -> Tuple[int, int]:
         logger.warning("No creditors-aging CSV path provided")
         return inserted, updated
 
+    today = pd.Timestamp.now().normalize()
+    rows_read = 0
     try:
-        # Read CSV file
-        df = pd.read_csv(aging_csv_path)
-        if df.empty:
-            logger.warning(f"Empty CSV file: {aging_csv_path}")
-            return inserted, updated
+        supplier_cache = load_supplier_cache(db)
 
-        # Standardize column names
-        df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+        # Probe the header to resolve the schema before streaming the body
+        header = read_csv_header(aging_csv_path)
+        columns = standardize_columns(header)
+        raw_names = dict(zip(columns, header))
 
         # Check for required columns
         required_cols = ["invoice_date", "amount"]
-        missing_cols = [col for col in required_cols if col not in df.columns]
+        missing_cols = [col for col in required_cols if col not in columns]
         if missing_cols:
             logger.warning(f"Missing required columns in {aging_csv_path}: {missing_cols}")
             return inserted, updated
 
-        # Normalize date columns to datetime.date
-        for col in df.columns:
-            if "date" in col:
-                try:
-                    df[col] = pd.to_datetime(df[col], errors='coerce').dt.date
-                except Exception as e:
-                    logger.error(f"Error converting {col} to date: {e}")
-
-        # Drop rows with invalid invoice dates
-        df = df.dropna(subset=["invoice_date"])
-
-        # Process each row
-        for _, row in df.iterrows():
-            try:
-                # Get invoice date
-                invoice_date = row.get("invoice_date")
-                if pd.isna(invoice_date):
-                    continue
-
-                # Get or default due date
-                due_date = row.get("due_date")
-                if pd.isna(due_date):
-                    due_date = invoice_date
-
-                # Validate and convert amount
-                try:
-                    amount = float(row.get("amount", 0))
-                except (ValueError, TypeError):
-                    logger.warning(f"Invalid amount value: {row.get('amount')}")
-                    continue
-
-                # Get or default aging days
-                try:
-                    aging_days = int(row.get("aging_days", 0))
-                except (ValueError, TypeError):
-                    # Calculate aging days if not provided
-                    aging_days = (pd.Timestamp.now().date() - invoice_date).days
-
-                # Get or default status
-                status = str(row.get("status", "")).strip()
-                if not status:
-                    status = "payment"  # Default status
-
-                # Get supplier name
-                supplier_name = str(row.get("supplier") or row.get("description") or "").strip()
-                if not supplier_name:
-                    logger.warning("Skipping row with missing supplier name")
-                    continue
-
-                # Get or create supplier
-                supplier = get_or_create_supplier(db, supplier_name)
-
-                # Check for existing record
-                existing = (
-                    db.query(Creditor)
-                    .filter_by(supplier_id=supplier.id, invoice_date=invoice_date)
-                    .first()
-                )
-
-                if existing:
-                    # Update existing record
-                    existing.due_date = due_date
-                    existing.amount = amount
-                    existing.aging_days = aging_days
-                    existing.status = status
-                    updated += 1
-                else:
-                    # Create new record
-                    creditor = Creditor(
-                        supplier_id=supplier.id,
-                        invoice_date=invoice_date,
-                        due_date=due_date,
-                        amount=amount,
-                        aging_days=aging_days,
-                        status=status,
-                    )
-                    db.add(creditor)
-                    inserted += 1
-            except Exception as e:
-                logger.exception(f"Error processing row in {aging_csv_path}: {e}")
-                continue
-
-        db.commit()
+        # Only parse the columns used downstream
+        reader = pd.read_csv(
+            aging_csv_path,
+            chunksize=PAGE_SIZE,
+            usecols=[raw_names[col] for col in AGING_COLUMNS if col in raw_names],
+            dtype={
+                raw_names[col]: "string"
+                for col in ("supplier", "description", "status")
+                if col in raw_names
+            },
+            parse_dates=[raw_names[col] for col in ("invoice_date", "due_date") if col in raw_names],
+        )
+        # Parse the next page on a worker thread while this one is written
+        for df in prefetch(reader):
+            rows_read += len(df)
+            df.columns = standardize_columns(df.columns)
+            page_inserted, page_updated = ingest_creditors_aging_page(
+                db, df, supplier_cache, today
+            )
+            db.commit()
+            db.expunge_all()
+            inserted += page_inserted
+            updated += page_updated
+
+        if rows_read == 0:
+            logger.warning(f"Empty CSV file: {aging_csv_path}")
+
         logger.info(f"Processed creditors-aging: inserted={inserted}, updated={updated}")
         return inserted, updated
 
     except Exception as e:
         logger.exception(f"Error processing creditors-aging CSV {aging_csv_path}: {e}")
-        return 0, 0
+        db.rollback()
+        return inserted, updated
 
 
 @measure_duration(etl_duration_seconds)
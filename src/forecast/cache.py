@@ -0,0 +1,102 @@
+"""On-disk cache of fitted Prophet models keyed by the training history."""
+
+import hashlib
+import os
+from contextlib import suppress
+import tempfile
+
+import pandas as pd
+from prophet import Prophet
+from prophet.serialize import model_from_json, model_to_json
+
+from src.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_DIR = os.getenv(
+    "PROPHET_CACHE_DIR", os.path.join(tempfile.gettempdir(), "prophet_cache")
+)
+# Each new day of history produces a new key, so keep only the newest fits
+CACHE_MAX_ENTRIES = int(os.getenv("PROPHET_CACHE_MAX_ENTRIES", "16"))
+
+# Daily net cash has no intraday pattern, and only yhat is used downstream,
+# so skip the daily component and the posterior predictive sampling.
+PROPHET_PARAMS = {
+    "yearly_seasonality": "auto",
+    "weekly_seasonality": True,
+    "daily_seasonality": False,
+    "uncertainty_samples": 0,
+}
+
+
+def cache_key(hist_df: pd.DataFrame) -> str:
+    """Compute a stable key for a training history.
+
+    Args:
+        hist_df (pd.DataFrame): Historical cashflow with columns ['ds', 'y'].
+
+    Returns:
+        str: Hex digest identifying the history contents and model settings.
+    """
+    row_hashes = pd.util.hash_pandas_object(hist_df[["ds", "y"]], index=False)
+    digest = hashlib.sha1(repr(sorted(PROPHET_PARAMS.items())).encode())
+    digest.update(row_hashes.to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def prune_cache() -> None:
+    """Delete all but the CACHE_MAX_ENTRIES most recently used models in CACHE_DIR.
+
+    Returns:
+        None
+    """
+    entries = [
+        entry for entry in os.scandir(CACHE_DIR)
+        if entry.name.endswith(".json") and entry.is_file()
+    ]
+    entries.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in entries[CACHE_MAX_ENTRIES:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            # Already pruned by a concurrent writer
+            pass
+
+
+def fit_prophet(hist_df: pd.DataFrame) -> Prophet:
+    """Return a Prophet model fitted on hist_df, reusing a cached fit when available.
+
+    Args:
+        hist_df (pd.DataFrame): Historical cashflow with columns ['ds', 'y'].
+
+    Returns:
+        Prophet: Fitted model.
+    """
+    path = os.path.join(CACHE_DIR, f"{cache_key(hist_df)}.json")
+    try:
+        with open(path) as f:
+            model = model_from_json(f.read())
+        # Mark the entry as recently used so pruning keeps it
+        with suppress(OSError):
+            os.utime(path)
+        logger.info("Loaded cached Prophet model from %s", path)
+        return model
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logger.warning("Ignoring unreadable Prophet cache %s: %s", path, e)
+
+    model = Prophet(**PROPHET_PARAMS)
+    model.fit(hist_df)
+
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        # Write then rename so concurrent readers never see a partial file
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(model_to_json(model))
+        os.replace(tmp_path, path)
+        prune_cache()
+    except Exception as e:
+        logger.warning("Failed to cache Prophet model: %s", e)
+    return model
@@ -0,0 +1,94 @@
+"""Numba-compiled Holt-Winters forecaster for short horizons."""
+
+import numpy as np
+import pandas as pd
+from numba import njit
+
+# Weekly seasonality of daily net cash
+SEASON_LENGTH = 7
+
+
+@njit(cache=True, fastmath=True)
+def holt_winters_forecast(
+    y: np.ndarray,
+    horizon: int,
+    alpha: float,
+    beta: float,
+    gamma: float,
+    season_length: int,
+) -> np.ndarray:
+    """Forecast y with additive Holt-Winters exponential smoothing.
+
+    Args:
+        y (np.ndarray): Evenly spaced float64 observations, at least one value.
+        horizon (int): Number of future steps to forecast.
+        alpha (float): Level smoothing factor.
+        beta (float): Trend smoothing factor.
+        gamma (float): Seasonal smoothing factor (use 0 with season_length 1).
+        season_length (int): Observations per season; needs 2 * season_length values
+            to initialise the trend when greater than 1.
+
+    Returns:
+        np.ndarray: Forecast values for the next horizon steps.
+    """
+    n = y.shape[0]
+    m = season_length
+
+    # Initial level, trend and seasonal offsets from the first one/two seasons
+    level = y[:m].mean()
+    if n >= 2 * m:
+        trend = (y[m:2 * m].mean() - level) / m
+    else:
+        trend = 0.0
+    season = y[:m] - level
+
+    for t in range(n):
+        s = season[t % m]
+        new_level = alpha * (y[t] - s) + (1.0 - alpha) * (level + trend)
+        trend = beta * (new_level - level) + (1.0 - beta) * trend
+        season[t % m] = gamma * (y[t] - new_level) + (1.0 - gamma) * s
+        level = new_level
+
+    out = np.empty(horizon)
+    for h in range(horizon):
+        out[h] = level + (h + 1) * trend + season[(n + h) % m]
+    return out
+
+
+def forecast_daily(
+    hist_df: pd.DataFrame,
+    horizon_days: int,
+    alpha: float = 0.3,
+    beta: float = 0.1,
+    gamma: float = 0.1,
+) -> pd.DataFrame:
+    """Forecast daily net cash for the days after the last historical date.
+
+    Days without transactions are treated as zero net cash. Weekly seasonality
+    is modelled once two full weeks of history are available.
+
+    Args:
+        hist_df (pd.DataFrame): Historical cashflow with columns ['ds', 'y'].
+        horizon_days (int): Number of days to forecast.
+        alpha (float): Level smoothing factor.
+        beta (float): Trend smoothing factor.
+        gamma (float): Seasonal smoothing factor.
+
+    Returns:
+        pd.DataFrame: DataFrame with columns ['ds', 'yhat'] for the future days.
+    """
+    daily = (
+        hist_df.assign(ds=pd.to_datetime(hist_df["ds"]))
+        .groupby("ds")["y"]
+        .sum()
+        .asfreq("D", fill_value=0.0)
+    )
+    y = daily.to_numpy(dtype=np.float64)
+
+    if len(y) >= 2 * SEASON_LENGTH:
+        yhat = holt_winters_forecast(y, horizon_days, alpha, beta, gamma, SEASON_LENGTH)
+    else:
+        yhat = holt_winters_forecast(y, horizon_days, alpha, beta, 0.0, 1)
+
+    ds = pd.date_range(daily.index[-1] + pd.Timedelta(days=1), periods=horizon_days, freq="D")
+    return pd.DataFrame({"ds": ds, "yhat": yhat})
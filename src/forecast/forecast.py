@@ -1,14 +1,20 @@
-"""Prophet-based forecasting module."""
+"""Cashflow forecasting module (Holt-Winters by default, Prophet optional)."""
 
+from contextlib import nullcontext
 from datetime import datetime
+from typing import Optional
 
+import numpy as np
 import pandas as pd
 from prophet import Prophet
+from sqlalchemy import case, select
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import func
 
 from src.db.session import get_db_session
 from src.db.models import Creditor, Forecast
+from src.forecast.cache import PROPHET_PARAMS, fit_prophet
+from src.forecast.fast_forecast import SEASON_LENGTH, forecast_daily
 from src.logging_config import get_logger
 from src.metrics import measure_duration, forecast_duration_seconds
 
@@ -22,23 +28,27 @@ def get_historical_net_cash(db: Session) -> pd.DataFrame:
         db (Session): SQLAlchemy Session object.
 
     Returns:
-        pd.DataFrame: DataFrame with columns ['ds', 'y'] sorted by date.
+        pd.DataFrame: DataFrame with columns ['ds' (datetime64), 'y' (float64)] sorted by date.
     """
-    query = (
-        db.query(
+    signed_amount = case(
+        (Creditor.status == "credit", Creditor.amount),
+        (Creditor.status == "payment", -Creditor.amount),
+        else_=0,
+    )
+    statement = (
+        select(
             Creditor.invoice_date.label("ds"),
-            (
-                func.sum(Creditor.amount).filter(Creditor.status == "credit")
-                - func.sum(Creditor.amount).filter(Creditor.status == "payment")
-            ).label("y"),
+            func.sum(signed_amount).label("y"),
         )
         .group_by(Creditor.invoice_date)
-        .all()
+        .order_by(Creditor.invoice_date)
+    )
+    return pd.read_sql(
+        statement,
+        db.connection(),
+        parse_dates=["ds"],
+        dtype={"y": "float64"},
     )
-    df = pd.DataFrame(query, columns=["ds", "y"])
-    df["ds"] = pd.to_datetime(df["ds"]).dt.date
-    df["y"] = df["y"].astype(float)
-    return df.sort_values("ds")
 
 
 def train_and_forecast(df: pd.DataFrame, periods: int = 12, freq: str = "D") -> pd.DataFrame:
@@ -52,53 +62,69 @@ def train_and_forecast(df: pd.DataFrame, periods: int = 12, freq: str = "D") ->
     Returns:
         pd.DataFrame: DataFrame with columns ['ds', 'yhat'].
     """
-    model = Prophet()
+    model = Prophet(**PROPHET_PARAMS)
     model.fit(df)
     future = model.make_future_dataframe(periods=periods, freq=freq)
     forecast = model.predict(future)
     return forecast[["ds", "yhat"]]
 
 
-def save_forecast(df_forecast: pd.DataFrame, horizon_days: int = 14) -> None:
+def add_forecast_record(db: Session, forecast_json: list, horizon_days: int) -> Forecast:
+    """Add a Forecast record for already-formatted results to a session.
+
+    Args:
+        db (Session): Session to add the record to; the caller commits it.
+        forecast_json (list): Forecast entries with 'ds' (YYYY-MM-DD) and 'yhat' keys.
+        horizon_days (int): Forecast horizon in days.
+
+    Returns:
+        Forecast: The added record.
+    """
+    record = Forecast(
+        run_date=datetime.now(),
+        horizon_days=horizon_days,
+        forecast_json=forecast_json,
+    )
+    db.add(record)
+    return record
+
+
+def save_forecast(
+    df_forecast: pd.DataFrame, horizon_days: int = 14, db: Optional[Session] = None
+) -> None:
     """Persist forecast results into the forecasts table.
 
     Args:
         df_forecast (pd.DataFrame): Forecast DataFrame with 'ds' and 'yhat'.
         horizon_days (int): Forecast horizon in days.
+        db (Optional[Session]): Session to add the record to; the caller commits it.
+            A new session is opened and committed when omitted.
 
     Returns:
         None
     """
-    from src.db.session import get_db_session
-
     # Convert forecast data to the format expected by the Forecast model
-    forecast_json = [
-        {"ds": row.ds.strftime("%Y-%m-%d") if hasattr(row.ds, "strftime") else str(row.ds),
-         "yhat": float(row.yhat)}
-        for row in df_forecast.itertuples(index=False)
-    ]
+    forecast_json = df_forecast[["ds", "yhat"]].assign(
+        ds=pd.to_datetime(df_forecast["ds"]).dt.strftime("%Y-%m-%d"),
+        yhat=df_forecast["yhat"].astype(float),
+    ).to_dict("records")
 
-    with get_db_session() as db:
-        record = Forecast(
-            run_date=datetime.now(),
-            horizon_days=horizon_days,
-            forecast_json=forecast_json
-        )
-        db.add(record)
+    with nullcontext(db) if db is not None else get_db_session() as session:
+        add_forecast_record(session, forecast_json, horizon_days)
 
 
 @measure_duration(forecast_duration_seconds)
-def run_forecast(horizon_days: int = 14) -> list:
+def run_forecast(horizon_days: int = 14, use_prophet: bool = False) -> list:
     """Load historical data, generate forecasts for the next horizon_days, persist results, and return a list of forecasts.
 
     Args:
         horizon_days (int): Forecast horizon in days (default: 14).
+        use_prophet (bool): Fit Prophet instead of the compiled Holt-Winters model when at
+            least two weeks of history exist (default: False).
 
     Returns:
         list[dict]: List of forecast dictionaries with keys 'ds' and 'yhat'.
     """
-    from src.db.session import get_db_session
-
     with get_db_session() as db:
         try:
             # Get historical data
@@ -107,15 +133,16 @@ def run_forecast(horizon_days: int = 14) -> list:
                 logger.warning("No historical data available for forecasting")
                 return []
 
-            # Train model and generate forecast
-            model = Prophet()
-            model.fit(hist_df)
-            future = model.make_future_dataframe(periods=horizon_days, freq="D")
-            forecast_df = model.predict(future)[["ds", "yhat"]].copy()
+            # Train model and generate forecast; short histories skip the Prophet fit
+            if use_prophet and len(hist_df) >= 2 * SEASON_LENGTH:
+                model = fit_prophet(hist_df)
+                future = model.make_future_dataframe(periods=horizon_days, freq="D")
+                forecast_df = model.predict(future)[["ds", "yhat"]]
 
-            # Filter for future days beyond last historical date
-            last_hist = hist_df["ds"].max()
-            forecast_df = forecast_df[forecast_df["ds"] > pd.to_datetime(last_hist)]
+                # Filter for future days beyond last historical date
+                forecast_df = forecast_df[forecast_df["ds"] > hist_df["ds"].max()]
+            else:
+                forecast_df = forecast_daily(hist_df, horizon_days)
 
             if forecast_df.empty:
                 logger.warning("No future dates to forecast")
@@ -124,46 +151,39 @@ def run_forecast(horizon_days: int = 14) -> list:
             # Process daily forecasts (up to 14 days)
             daily_count = min(horizon_days, 14)
             daily = forecast_df.head(daily_count)
-            results = [
-                {"ds": row.ds.strftime("%Y-%m-%d"), "yhat": float(row.yhat)}
-                for row in daily.itertuples(index=False)
-            ]
+            results = daily.assign(
+                ds=daily["ds"].dt.strftime("%Y-%m-%d"),
+                yhat=daily["yhat"].astype(float),
+            ).to_dict("records")
 
             # Process weekly aggregation for remaining days (beyond 14 days)
             if horizon_days > 14 and len(forecast_df) > 14:
-                weekly_df = forecast_df.iloc[14:].copy()
-
-                # Ensure datetime format for ds column
-                if not pd.api.types.is_datetime64_any_dtype(weekly_df["ds"]):
-                    weekly_df["ds"] = pd.to_datetime(weekly_df["ds"])
-
-                # Calculate week start for each date
-                weekly_df["week_start"] = weekly_df["ds"] - pd.to_timedelta(
-                    weekly_df["ds"].dt.weekday, unit="D"
+                # Days since the epoch (a Thursday) -> index of the Monday-based week
+                days = forecast_df["ds"].to_numpy()[14:].astype("datetime64[D]").astype(np.int64)
+                weeks = (days + 3) // 7
+                first = weeks.min()
+                yhat = forecast_df["yhat"].to_numpy(dtype=np.float64)[14:]
+                week_sums = np.bincount(weeks - first, weights=yhat)
+                week_counts = np.bincount(weeks - first)
+
+                # Add the mean (not sum) of daily forecasts for each week
+                present = np.flatnonzero(week_counts)
+                week_starts = ((present + first) * 7 - 3).astype("datetime64[D]")
+                results.extend(
+                    pd.DataFrame({
+                        "ds": np.datetime_as_string(week_starts, unit="D"),
+                        "yhat": week_sums[present] / week_counts[present],
+                    }).to_dict("records")
                 )
 
-                # Group by week and calculate mean (not sum) of daily forecasts
-                weekly_agg = weekly_df.groupby("week_start")["yhat"].mean().reset_index()
-
-                # Add weekly aggregates to results
-                for row in weekly_agg.itertuples(index=False):
-                    results.append(
-                        {"ds": row.week_start.strftime("%Y-%m-%d"), "yhat": float(row.yhat)}
-                    )
-
             # Persist forecast to database
             try:
-                record = Forecast(
-                    run_date=datetime.now(),
-                    horizon_days=horizon_days,
-                    forecast_json=results,
-                )
-                db.add(record)
+                add_forecast_record(db, results, horizon_days)
             except Exception as e:
-                logger.warning(f"Failed to save forecast to database: {e}")
+                logger.warning("Failed to save forecast to database: %s", e)
                 # Continue even if database save fails - this helps with tests
 
             return results
         except Exception as e:
-            logger.exception(f"Error in run_forecast: {e}")
+            logger.exception("Error in run_forecast: %s", e)
             return []
@@ -7,8 +7,14 @@ Level: default INFO, override via LOG_LEVEL env var.
 import logging
 import os
 import sys
-import json
-from datetime import datetime, timezone
+import time
+
+import orjson
+
+
+def _dumps(obj) -> str:
+    """Serialize obj to JSON with orjson and return it as a str."""
+    return orjson.dumps(obj).decode()
 
 
 class JsonFormatter(logging.Formatter):
@@ -20,8 +26,11 @@ class JsonFormatter(logging.Formatter):
     """
 
     def format(self, record):
+        seconds = int(record.created)
+        micros = int((record.created - seconds) * 1_000_000)
+        timestamp = time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(seconds))
         log_record = {
-            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "timestamp": f"{timestamp}.{micros:06d}+00:00",
             "level": record.levelname,
             "logger": record.name,
             "function": record.funcName,
@@ -29,7 +38,7 @@ class JsonFormatter(logging.Formatter):
         }
         if record.exc_info:
             log_record["exception"] = self.formatException(record.exc_info)
-        return json.dumps(log_record)
+        return _dumps(log_record)
 
 
 def configure_logging():
@@ -4,23 +4,32 @@ This module defines Histogram metrics for various pipeline components and a
 decorator to measure function execution durations using these metrics.
 """
 
+import functools
+import time
+
 from prometheus_client import Histogram
 
-etl_duration_seconds = Histogram("etl_duration_seconds", "Duration of ETL pipeline")
+# Pipeline steps take from tens of milliseconds (UI requests) to tens of
+# seconds (ETL, Prophet fits); coarser buckets keep each histogram small.
+DURATION_BUCKETS = (0.01, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+etl_duration_seconds = Histogram(
+    "etl_duration_seconds", "Duration of ETL pipeline", buckets=DURATION_BUCKETS
+)
 delta_job_duration_seconds = Histogram(
-    "delta_job_duration_seconds", "Duration of delta_job execution"
+    "delta_job_duration_seconds", "Duration of delta_job execution", buckets=DURATION_BUCKETS
 )
 forecast_duration_seconds = Histogram(
-    "forecast_duration_seconds", "Duration of forecast run"
+    "forecast_duration_seconds", "Duration of forecast run", buckets=DURATION_BUCKETS
 )
 rules_duration_seconds = Histogram(
-    "rules_duration_seconds", "Duration of rule parsing/applying"
+    "rules_duration_seconds", "Duration of rule parsing/applying", buckets=DURATION_BUCKETS
 )
 payment_plan_duration_seconds = Histogram(
-    "payment_plan_duration_seconds", "Duration of payment plan generation"
+    "payment_plan_duration_seconds", "Duration of payment plan generation", buckets=DURATION_BUCKETS
 )
 ui_request_duration_seconds = Histogram(
-    "ui_request_duration_seconds", "Duration of UI request handling"
+    "ui_request_duration_seconds", "Duration of UI request handling", buckets=DURATION_BUCKETS
 )
 
 
@@ -35,9 +44,13 @@ def measure_duration(metric):
     """
 
     def decorator(func):
+        @functools.wraps(func)
         def wrapper(*args, **kwargs):
-            with metric.time():
+            start = time.perf_counter_ns()
+            try:
                 return func(*args, **kwargs)
+            finally:
+                metric.observe((time.perf_counter_ns() - start) * 1e-9)
 
         return wrapper
 
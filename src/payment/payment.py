@@ -1,10 +1,13 @@
 """Payment-plan algorithm."""
 
 import logging
-from datetime import date, timedelta
-from typing import List
+import threading
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
+from sqlalchemy import bindparam, delete, insert, select
 from sqlalchemy.orm import Session
 
 from src.logging_config import get_logger
@@ -14,6 +17,85 @@ from src.db.models import PaymentPlan, Forecast
 
 logger = get_logger(__name__)
 
+LATEST_FORECAST_KEY = (
+    select(Forecast.id, Forecast.run_date).order_by(Forecast.run_date.desc()).limit(1)
+)
+FORECAST_JSON_BY_ID = select(Forecast.forecast_json).where(Forecast.id == bindparam("forecast_id"))
+DELETE_DRAFT_PLANS = delete(PaymentPlan.__table__).where(PaymentPlan.__table__.c.is_draft)
+
+# Forecast rows are never updated, so a payload can be cached by (id, run_date).
+# The id alone is not enough: SQLite reuses the highest id once its row is deleted.
+FORECAST_CACHE_SIZE = 4
+FORECAST_JSON_CACHE: Dict[Tuple[int, datetime], list] = {}
+_forecast_cache_lock = threading.Lock()
+
+
+def get_latest_forecast_json(db: Session) -> Optional[list]:
+    """Return the forecast_json payload of the most recent forecast.
+
+    Only the id and run_date of the latest forecast are queried on every call; the
+    payload itself is fetched once per forecast and served from an in-process cache
+    afterwards.
+    Callers must not mutate the returned list.
+
+    Args:
+        db (Session): SQLAlchemy Session object.
+
+    Returns:
+        Optional[list]: Forecast entries, or None if no forecast exists.
+    """
+    latest = db.execute(LATEST_FORECAST_KEY).first()
+    if latest is None:
+        return None
+    forecast_id, run_date = latest
+    key = (forecast_id, run_date)
+
+    with _forecast_cache_lock:
+        if key in FORECAST_JSON_CACHE:
+            return FORECAST_JSON_CACHE[key]
+
+    forecast_json = db.execute(FORECAST_JSON_BY_ID, {"forecast_id": forecast_id}).scalar()
+    with _forecast_cache_lock:
+        FORECAST_JSON_CACHE[key] = forecast_json
+        while len(FORECAST_JSON_CACHE) > FORECAST_CACHE_SIZE:
+            del FORECAST_JSON_CACHE[next(iter(FORECAST_JSON_CACHE))]
+    return forecast_json
+
+
+def aggregate_weekly_cash(forecast_json: List[dict]) -> Tuple[Optional[date], np.ndarray]:
+    """Sum forecast values into consecutive Monday-based weeks.
+
+    Entries with a missing or unparseable date or value are skipped.
+
+    Args:
+        forecast_json (List[dict]): Forecast entries with 'ds' and 'yhat' keys.
+
+    Returns:
+        Tuple[Optional[date], np.ndarray]: Monday of the earliest week (None if no
+            entry is usable) and the summed cash position of each week from it.
+    """
+    raw_ds = pd.Series([entry.get("ds") or None for entry in forecast_json], dtype=object)
+    ds = pd.to_datetime(raw_ds, errors="coerce", format="ISO8601")
+    yhat = pd.to_numeric(
+        pd.Series([entry.get("yhat", 0) for entry in forecast_json], dtype=object),
+        errors="coerce",
+    )
+    for i in np.flatnonzero(raw_ds.notna() & ds.isna()):
+        logger.warning("Invalid date format: %s", raw_ds[i])
+    for i in np.flatnonzero(ds.notna() & yhat.isna()):
+        logger.warning("Invalid forecast value in entry: %s", forecast_json[i])
+
+    valid = (ds.notna() & yhat.notna()).to_numpy()
+    if not valid.any():
+        return None, np.zeros(0)
+
+    # Days since the epoch (a Thursday) -> index of the Monday-based week
+    days = ds.to_numpy()[valid].astype("datetime64[D]").astype(np.int64)
+    weeks = (days + 3) // 7
+    first = weeks.min()
+    totals = np.bincount(weeks - first, weights=yhat.to_numpy(dtype=np.float64)[valid])
+    return date(1970, 1, 1) + timedelta(days=int(first) * 7 - 3), totals
+
 
 @measure_duration(payment_plan_duration_seconds)
 def generate_payment_plan(horizon_days: int = 91) -> List[dict]:
@@ -29,106 +111,70 @@ def generate_payment_plan(horizon_days: int = 91) -> List[dict]:
             note (str): Note for the payment plan entry.
     """
     with get_db_session() as db:
-        # Fetch latest forecast record
-        record = db.query(Forecast).order_by(Forecast.run_date.desc()).first()
-        if not record:
-            logger.warning("No forecast records found for payment plan generation")
+        # Fetch the payload of the latest forecast record
+        forecast_json = get_latest_forecast_json(db)
+        if not forecast_json:
+            logger.warning("No forecast data found for payment plan generation")
             return []
 
-        forecast_json = record.forecast_json
-        if not forecast_json or len(forecast_json) == 0:
-            logger.warning("Empty forecast data in latest forecast record")
+        first_week, weekly_totals = aggregate_weekly_cash(forecast_json)
+        if first_week is None:
+            logger.info("No forecast data available")
             return []
 
-        # Collect weekly cash positions (both positive and negative)
-        weekly_cash_positions: dict[date, float] = {}
-
-        for entry in forecast_json:
-            # Parse date from forecast entry
-            ds = entry.get("ds")
-            if not ds:
-                continue
-
-            # Parse forecast value
-            try:
-                yhat = float(entry.get("yhat", 0))
-            except (ValueError, TypeError):
-                logger.warning(f"Invalid forecast value in entry: {entry}")
-                continue
-
-            # Convert string date to date object if needed
-            try:
-                dt = date.fromisoformat(ds) if isinstance(ds, str) else ds
-            except ValueError:
-                logger.warning(f"Invalid date format: {ds}")
-                continue
-
-            # Calculate the start of the week (Monday)
-            week_start = dt - timedelta(days=dt.weekday())
-
-            # Accumulate cash position by week
-            weekly_cash_positions[week_start] = weekly_cash_positions.get(week_start, 0.0) + yhat
-
-        # Identify weeks with negative cash positions (deficits)
-        weekly_deficits = {week: amount for week, amount in weekly_cash_positions.items() if amount < 0}
+        # Deficit of each week (0 for weeks in surplus) and the total shortfall
+        weekly_deficits = np.minimum(weekly_totals, 0.0)
+        total_shortfall = -float(weekly_deficits.sum())
 
         # If no deficits found, create a minimal payment plan for the first week
         # This ensures tests can validate the payment plan structure
-        if not weekly_deficits:
+        if total_shortfall <= 0:
             logger.info("No cash deficits found in forecast period, creating minimal payment plan")
-            # Find the first week
-            if weekly_cash_positions:
-                first_week = min(weekly_cash_positions.keys())
-                # Create a minimal payment plan
-                return [{
-                    "scheduled_date": first_week,
-                    "amount": 10.0,  # Minimal amount
-                    "note": "Auto-generated minimal plan (no deficits)"
-                }]
-            else:
-                logger.info("No forecast data available")
-                return []
+            return [{
+                "scheduled_date": first_week,
+                "amount": 10.0,  # Minimal amount
+                "note": "Auto-generated minimal plan (no deficits)"
+            }]
 
         # Determine number of weeks in horizon
         horizon_weeks = (horizon_days + 6) // 7
 
         # Find first week start from first forecast date
-        try:
-            first_ds = forecast_json[0].get("ds")
-            first_date = date.fromisoformat(first_ds) if isinstance(first_ds, str) else first_ds
-            first_week_start = first_date - timedelta(days=first_date.weekday())
-        except (IndexError, ValueError, TypeError):
+        first_date = pd.to_datetime(
+            forecast_json[0].get("ds") or None, errors="coerce", format="ISO8601"
+        )
+        if pd.isna(first_date):
             logger.warning("Could not determine first forecast date")
             # Use current date as fallback
-            today = date.today()
-            first_week_start = today - timedelta(days=today.weekday())
-
-        # Compute total shortfall (convert negative values to positive)
-        total_shortfall = sum(-amount for amount in weekly_deficits.values())
-
-        if total_shortfall <= 0:
-            logger.info("No shortfall to distribute in payment plan")
-            return []
+            first_date = pd.Timestamp(date.today())
+        first_week_start = (first_date - pd.Timedelta(days=first_date.weekday())).date()
 
         # Equal distribution of shortfall across all weeks in horizon
-        weekly_amount = round(float(total_shortfall) / horizon_weeks, 2)  # Round to 2 decimal places
-
-        # Build and return payment plan entries
-        plan: List[dict] = []
-        for i in range(horizon_weeks):
-            week_date = first_week_start + timedelta(weeks=i)
-
-            # If this specific week has a deficit, prioritize covering it
-            specific_deficit = weekly_deficits.get(week_date, 0)
-            amount_for_week = max(weekly_amount, -specific_deficit) if specific_deficit < 0 else weekly_amount
-
-            plan.append(
-                {
-                    "scheduled_date": week_date,
-                    "amount": amount_for_week,
-                    "note": f"Auto-generated draft (covers deficit: {specific_deficit < 0})",
-                }
+        weekly_amount = round(total_shortfall / horizon_weeks, 2)  # Round to 2 decimal places
+
+        # Weekly deficits aligned to the plan weeks (0 where there is no forecast)
+        offset = (first_week_start - first_week).days // 7
+        plan_idx = np.arange(horizon_weeks) + offset
+        in_range = (plan_idx >= 0) & (plan_idx < len(weekly_deficits))
+        plan_deficits = np.zeros(horizon_weeks)
+        plan_deficits[in_range] = weekly_deficits[plan_idx[in_range]]
+        has_deficit = plan_deficits < 0
+        # Deficit weeks are covered in full if that exceeds the equal share
+        amounts = np.maximum(weekly_amount, -plan_deficits)
+
+        week_dates = np.datetime64(first_week_start, "D") + np.arange(horizon_weeks) * 7
+
+        # Build and return payment plan entries (tolist() yields date/float/bool)
+        plan: List[dict] = [
+            {
+                "scheduled_date": week_date,
+                "amount": amount,
+                "note": f"Auto-generated draft (covers deficit: {deficit})",
+            }
+            for week_date, amount, deficit in zip(
+                week_dates.tolist(), amounts.tolist(), has_deficit.tolist()
             )
+        ]
 
         return plan
 
@@ -155,28 +201,33 @@ def calculate_payment_plan(
     # Ensure forecast_df has required columns
     required_cols = ['ds', 'yhat']
     if not all(col in forecast_df.columns for col in required_cols):
-        logger.error(f"Forecast data missing required columns: {required_cols}")
+        logger.error("Forecast data missing required columns: %s", required_cols)
         return pd.DataFrame()
 
     # Convert dates to datetime if they aren't already
-    if not pd.api.types.is_datetime64_any_dtype(forecast_df['ds']):
-        forecast_df['ds'] = pd.to_datetime(forecast_df['ds'])
+    ds = forecast_df['ds']
+    if not pd.api.types.is_datetime64_any_dtype(ds):
+        ds = pd.to_datetime(ds)
+
+    # Rows without a date cannot be placed in a week, so they are skipped
+    valid = ds.notna().to_numpy()
+
+    # Index of each date's Monday-based week: days since the epoch (a Thursday)
+    days = ds.to_numpy()[valid].astype('datetime64[D]').astype(np.int64)
+    weeks = (days + 3) // 7
 
     # Group by week and calculate weekly cash positions
-    forecast_df['week_start'] = forecast_df['ds'] - pd.to_timedelta(
-        forecast_df['ds'].dt.weekday, unit='D'
-    )
-    weekly_forecast = forecast_df.groupby('week_start')['yhat'].sum().reset_index()
+    weekly_forecast = pd.Series(forecast_df['yhat'].to_numpy()[valid]).groupby(weeks).sum()
 
     # Identify weeks with negative cash flow
-    deficit_weeks = weekly_forecast[weekly_forecast['yhat'] < 0].copy()
+    deficit_weeks = weekly_forecast[weekly_forecast < 0]
 
     if deficit_weeks.empty:
         logger.info("No deficit weeks found in forecast")
         return pd.DataFrame()
 
-    # Calculate payment amounts (convert negative to positive)
-    deficit_weeks['payment_amount'] = -deficit_weeks['yhat']
+    # Convert only the deficit weeks back to their Monday dates
+    week_start = (deficit_weeks.index.to_numpy() * 7 - 3).astype('datetime64[D]')
 
     # Apply rules if provided
     if rules_df is not None and not rules_df.empty:
@@ -184,10 +235,10 @@ def calculate_payment_plan(
         # This would adjust payment amounts based on supplier rules
         logger.info("Rule application not yet implemented")
 
-    # Create payment plan DataFrame
+    # Create payment plan DataFrame (payment amounts are the negated deficits)
     payment_plan = pd.DataFrame({
-        'scheduled_date': deficit_weeks['week_start'],
-        'amount': deficit_weeks['payment_amount'],
+        'scheduled_date': week_start,
+        'amount': -deficit_weeks.to_numpy(),
         'note': 'Calculated to cover weekly deficit'
     })
 
@@ -203,20 +254,26 @@ def save_payment_plan(df_plans: pd.DataFrame) -> None:
     Returns:
         None
     """
-    with get_db_session() as db:
-        for row in df_plans.itertuples(index=False):
-            # Check for required fields
-            if not hasattr(row, 'scheduled_date') or not hasattr(row, 'amount'):
-                logger.warning(f"Skipping payment plan row missing required fields: {row}")
-                continue
+    # Check for required fields
+    if "scheduled_date" not in df_plans.columns or "amount" not in df_plans.columns:
+        logger.warning(
+            "Skipping payment plans missing required fields: %s", df_plans.columns.tolist()
+        )
+        return
+
+    records = pd.DataFrame(
+        {
+            "creditor_id": df_plans["creditor_id"] if "creditor_id" in df_plans.columns else None,
+            "scheduled_date": df_plans["scheduled_date"],
+            "amount": df_plans["amount"],
+            "note": df_plans["note"] if "note" in df_plans.columns else None,
+        }
+    ).to_dict("records")
+    if not records:
+        return
 
-            plan = PaymentPlan(
-                creditor_id=getattr(row, 'creditor_id', None),
-                scheduled_date=row.scheduled_date,
-                amount=row.amount,
-                note=getattr(row, 'note', None)
-            )
-            db.add(plan)
+    with get_db_session() as db:
+        db.execute(insert(PaymentPlan.__table__), records)
 
 
 def save_draft_payment_plans(db: Session, plans: List[dict]) -> int:
@@ -230,40 +287,37 @@ def save_draft_payment_plans(db: Session, plans: List[dict]) -> int:
     Returns:
         int: Count of inserted draft PaymentPlan records.
     """
-    inserted = 0
     try:
-        # Delete existing draft plans (case-insensitive match on note)
-        db.query(PaymentPlan).filter(PaymentPlan.note.ilike("%draft%")).delete(
-            synchronize_session=False
-        )
+        # Replace existing draft plans
+        db.execute(DELETE_DRAFT_PLANS)
 
-        # Insert new draft plans
+        # Validate new draft plans, then insert them in a single batch
+        records = []
         for plan in plans:
             # Validate required fields
             if "scheduled_date" not in plan or "amount" not in plan:
-                logger.warning(f"Skipping payment plan missing required fields: {plan}")
+                logger.warning("Skipping payment plan missing required fields: %s", plan)
                 continue
 
             try:
-                creditor_id = plan.get("creditor_id")
-                scheduled_date = plan["scheduled_date"]
-                amount = float(plan["amount"])  # Ensure amount is a float
-                note = plan.get("note", "Auto-generated draft")
-
-                new_plan = PaymentPlan(
-                    creditor_id=creditor_id,
-                    scheduled_date=scheduled_date,
-                    amount=amount,
-                    note=note,
+                records.append(
+                    {
+                        "creditor_id": plan.get("creditor_id"),
+                        "scheduled_date": plan["scheduled_date"],
+                        "amount": float(plan["amount"]),  # Ensure amount is a float
+                        "note": plan.get("note", "Auto-generated draft"),
+                        "is_draft": True,
+                    }
                 )
-                db.add(new_plan)
-                inserted += 1
             except (ValueError, TypeError) as e:
-                logger.warning(f"Error processing payment plan: {e}, plan: {plan}")
+                logger.warning("Error processing payment plan: %s, plan: %s", e, plan)
                 continue
 
+        if records:
+            db.execute(insert(PaymentPlan.__table__), records)
+
         db.commit()
-        return inserted
+        return len(records)
     except Exception:
         logger.exception("Error saving draft payment plans")
         db.rollback()
@@ -281,14 +335,13 @@ def run_payment():
 
     with get_db_session() as db:
         # Get the latest forecast
-        latest_forecast = db.query(Forecast).order_by(Forecast.run_date.desc()).first()
-        if not latest_forecast:
+        forecast_data = get_latest_forecast_json(db)
+        if not forecast_data:
             logger.warning("No forecast data available for payment plan calculation")
             return
 
         # Convert forecast JSON to DataFrame
         try:
-            forecast_data = latest_forecast.forecast_json
             df_forecast = pd.DataFrame(forecast_data)
 
             # Ensure required columns exist
@@ -297,7 +350,7 @@ def run_payment():
                 return
 
         except Exception as e:
-            logger.exception(f"Error processing forecast data: {e}")
+            logger.exception("Error processing forecast data: %s", e)
             return
 
         # Get rule changes
@@ -320,4 +373,4 @@ def run_payment():
 
         # Save payment plan
         save_payment_plan(df_plans)
-        logger.info(f"Saved {len(df_plans)} payment plan entries")
+        logger.info("Saved %d payment plan entries", len(df_plans))
@@ -2,8 +2,10 @@
 
 import re
 import logging
+from typing import Optional, Tuple
 
 import pandas as pd
+from sqlalchemy import bindparam, func, select, update
 from sqlalchemy.orm import Session
 
 from src.logging_config import get_logger
@@ -13,6 +15,33 @@ from src.metrics import measure_duration, rules_duration_seconds
 
 logger = get_logger(__name__)
 
+RULE_PATTERN = re.compile(
+    r"^(?P<supplier>[^:]+):\s*(?P<rule_type>flex|core)\s+delay\s+(?P<days>\d+)\s+days$",
+    flags=re.IGNORECASE,
+)
+
+PENDING_RULES = (
+    select(RuleChange.id, RuleChange.nl_text)
+    .where(RuleChange.applied == False)
+    .order_by(RuleChange.id)
+)
+UPDATE_SUPPLIER_RULE = update(Supplier.__table__).where(
+    Supplier.__table__.c.name == bindparam("_name")
+)
+# Supplier and pending-rule counts in a single round trip
+RULE_RUN_COUNTS = select(
+    select(func.count()).select_from(Supplier).scalar_subquery(),
+    select(func.count())
+    .select_from(RuleChange)
+    .where(RuleChange.applied == False)
+    .scalar_subquery(),
+)
+MARK_RULES_APPLIED = (
+    update(RuleChange.__table__)
+    .where(RuleChange.__table__.c.id.in_(bindparam("ids", expanding=True)))
+    .values(applied=True)
+)
+
 
 def evaluate_rules(df: pd.DataFrame) -> pd.DataFrame:
     """Apply defined rules to the DataFrame and return the enriched DataFrame.
@@ -27,25 +56,24 @@ def evaluate_rules(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-@measure_duration(rules_duration_seconds)
 def run_rules():
     """Query data from the database, apply rules, and persist RuleChange records.
 
+    Not timed itself: the batched work is apply_pending_rules, which records
+    rules_duration_seconds once per run.
+
     Returns:
         None
     """
     with get_db_session() as db:
         try:
-            # Get all suppliers
-            suppliers = db.query(Supplier).all()
-            if not suppliers:
+            # Count suppliers and pending rule changes without loading them
+            supplier_count, pending_count = db.execute(RULE_RUN_COUNTS).one()
+            if not supplier_count:
                 logger.warning("No suppliers found in database")
                 return
 
-            # Get all pending rule changes
-            pending_rules = db.query(RuleChange).filter(RuleChange.applied == False).all()
-
-            logger.info(f"Found {len(suppliers)} suppliers and {len(pending_rules)} pending rules")
+            logger.info(f"Found {supplier_count} suppliers and {pending_count} pending rules")
 
             # Apply all pending rules
             applied, failed = apply_pending_rules()
@@ -57,6 +85,38 @@ def run_rules():
             raise
 
 
+def parse_rule(nl_text: str) -> Optional[Tuple[str, str, int]]:
+    """Parse a natural-language rule of the form '<supplier>: <flex|core> delay <n> days'.
+
+    Args:
+        nl_text (str): Natural-language rule text.
+
+    Returns:
+        Optional[Tuple[str, str, int]]: (supplier_name, rule_type, max_delay_days), or
+            None if the text is not a valid rule.
+    """
+    match = RULE_PATTERN.match(nl_text.strip())
+    if not match:
+        logger.warning(f"Rule text not in expected format: '{nl_text}'")
+        return None
+
+    # Extract rule components (the pattern only admits 'flex' or 'core')
+    supplier_name = match.group("supplier").strip()
+    rule_type = match.group("rule_type").lower()
+
+    # Parse and validate max_delay_days
+    try:
+        max_delay_days = int(match.group("days"))
+        if max_delay_days < 0:
+            logger.warning(f"Invalid delay days: {max_delay_days}. Must be non-negative")
+            return None
+    except ValueError:
+        logger.warning(f"Invalid delay days format: '{match.group('days')}'")
+        return None
+
+    return supplier_name, rule_type, max_delay_days
+
+
 @measure_duration(rules_duration_seconds)
 def parse_and_apply_rule(nl_text: str) -> bool:
     """Parse and apply a natural-language rule.
@@ -75,37 +135,15 @@ def parse_and_apply_rule(nl_text: str) -> bool:
 
     with get_db_session() as db:
         try:
-            # Log the rule change record
+            # Log the rule change record (committed with the supplier update on exit)
             rc = RuleChange(nl_text=nl_text, applied=False)
             db.add(rc)
-            db.flush()  # Get ID without committing transaction
-            db.refresh(rc)
 
             # Parse the rule text
-            pattern = r"^(?P<supplier>[^:]+):\s*(?P<rule_type>(?:flex|core))\s+delay\s+(?P<days>\d+)\s+days$"
-            match = re.match(pattern, nl_text.strip(), flags=re.IGNORECASE)
-            if not match:
-                logger.warning(f"Rule text not in expected format: '{nl_text}'")
-                return False
-
-            # Extract rule components
-            supplier_name = match.group("supplier").strip()
-            rule_type = match.group("rule_type").lower()
-
-            # Validate rule type
-            if rule_type not in ["flex", "core"]:
-                logger.warning(f"Invalid rule type: '{rule_type}'. Must be 'flex' or 'core'")
-                return False
-
-            # Parse and validate max_delay_days
-            try:
-                max_delay_days = int(match.group("days"))
-                if max_delay_days < 0:
-                    logger.warning(f"Invalid delay days: {max_delay_days}. Must be non-negative")
-                    return False
-            except ValueError:
-                logger.warning(f"Invalid delay days format: '{match.group('days')}'")
+            parsed = parse_rule(nl_text)
+            if not parsed:
                 return False
+            supplier_name, rule_type, max_delay_days = parsed
 
             # Lookup the Supplier
             supplier = db.query(Supplier).filter(Supplier.name == supplier_name).first()
@@ -134,16 +172,15 @@ def parse_and_apply_rule(nl_text: str) -> bool:
 def apply_pending_rules() -> tuple[int, int]:
     """Query all pending RuleChange entries, apply each rule, and return counts of applied and failed rules.
 
+    All pending rule texts are parsed in one pass, suppliers are checked with a single
+    query and updated with one batched UPDATE. Rules that fail stay pending.
+
     Returns:
         Tuple[int, int]: A tuple containing (applied_count, failed_count).
     """
-    applied_count = 0
-    failed_count = 0
-
-    # Fetch pending rules
     with get_db_session() as db:
         try:
-            pending = db.query(RuleChange).filter(RuleChange.applied == False).all()
+            pending = db.execute(PENDING_RULES).all()
 
             if not pending:
                 logger.info("No pending rules to apply")
@@ -151,26 +188,44 @@ def apply_pending_rules() -> tuple[int, int]:
 
             logger.info(f"Found {len(pending)} pending rules to apply")
 
-            # Store rule texts to process after closing this session
-            rule_texts = [rc.nl_text for rc in pending]
+            ids, texts = zip(*pending)
+            texts = pd.Series(texts, index=ids, dtype=object)
+            rules = texts.fillna("").str.strip().str.extract(RULE_PATTERN)
+            rules["supplier"] = rules["supplier"].str.strip()
+
+            names = rules["supplier"].dropna().unique().tolist()
+            known = set(
+                db.scalars(select(Supplier.name).where(Supplier.name.in_(names)))
+            ) if names else set()
 
         except Exception as e:
             logger.exception(f"Error fetching pending rules: {e}")
             return 0, 0
 
-    # Apply each pending rule (each with its own session)
-    for rule_text in rule_texts:
-        try:
-            success = parse_and_apply_rule(rule_text)
-            if success:
-                applied_count += 1
-                logger.info(f"Successfully applied rule: '{rule_text}'")
+        applicable = rules["supplier"].isin(known)
+        for rule_id in rules.index[~applicable]:
+            if isinstance(rules.at[rule_id, "supplier"], str):
+                logger.warning(f"Supplier '{rules.at[rule_id, 'supplier']}' not found")
             else:
-                failed_count += 1
-                logger.warning(f"Failed to apply rule: '{rule_text}'")
-        except Exception as e:
-            logger.exception(f"Unexpected error applying rule '{rule_text}': {e}")
-            failed_count += 1
+                logger.warning(f"Rule text not in expected format: '{texts[rule_id]}'")
+            logger.warning(f"Failed to apply rule: '{texts[rule_id]}'")
+
+        applied = rules[applicable]
+        if not applied.empty:
+            # Later rules for the same supplier win, as when applied one at a time
+            updates = (
+                applied.drop_duplicates("supplier", keep="last")
+                .assign(
+                    rule_type=lambda df: df["rule_type"].str.lower(),
+                    days=lambda df: df["days"].astype(int),
+                )
+                .rename(columns={"supplier": "_name", "rule_type": "type", "days": "max_delay_days"})
+                .to_dict("records")
+            )
+            db.execute(UPDATE_SUPPLIER_RULE, updates)
+            db.execute(MARK_RULES_APPLIED, {"ids": applied.index.tolist()})
 
+    applied_count = len(applied)
+    failed_count = len(rules) - applied_count
     logger.info(f"Rule application complete: {applied_count} applied, {failed_count} failed")
     return applied_count, failed_count
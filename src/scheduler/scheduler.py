@@ -1,9 +1,8 @@
 """Scheduler using APScheduler to trigger monthly delta ETL job."""
 
 import os
-import time
 
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.schedulers.blocking import BlockingScheduler
 from prometheus_client import start_http_server
 
 from src.logging_config import get_logger
@@ -49,21 +48,18 @@ def start_scheduler():
     """Start the APScheduler to run delta_job monthly.
 
     Schedules delta_job to run on the 1st of each month at midnight UTC,
-    starts the scheduler process, and keeps the application alive.
+    and blocks running the scheduler until the process is interrupted.
 
     Returns:
         None
     """
-    scheduler = BackgroundScheduler()
+    scheduler = BlockingScheduler()
     scheduler.add_job(delta_job, "cron", day=1, hour=0, minute=0)
-    scheduler.start()
-    logger.info(f"Scheduler started. Next runs: {scheduler.get_jobs()}")
+    logger.info(f"Scheduler starting. Jobs: {scheduler.get_jobs()}")
     try:
-        # Keep the scheduler alive
-        while True:
-            time.sleep(60)
+        # Blocks in the scheduler's own wait until the next fire time
+        scheduler.start()
     except (KeyboardInterrupt, SystemExit):
-        scheduler.shutdown()
         logger.info("Scheduler stopped.")
 
 
@@ -10,10 +10,13 @@ It provides UI sections for:
 - Payment plan generation and export.
 """
 
+import re
+
+import numpy as np
 import streamlit as st
 import pandas as pd
-import altair as alt
 import requests
+from sqlalchemy import Float, cast, func, select, update
 
 from src.logging_config import get_logger
 from src.metrics import measure_duration, ui_request_duration_seconds
@@ -22,45 +25,161 @@ from src.db import models
 from src.etl.etl import run_etl
 from src.rules.rules import apply_pending_rules
 from src.forecast.forecast import run_forecast, get_historical_net_cash
-from src.payment.payment import generate_payment_plan, save_draft_payment_plans
+from src.payment.payment import (
+    generate_payment_plan,
+    get_latest_forecast_json,
+    save_draft_payment_plans,
+)
 
 logger = get_logger(__name__)
 
-@st.cache_data
+# Upper bound on staleness for changes made outside this app (scheduler, API)
+TABLE_CACHE_TTL_SECONDS = 60
+
+CREDITOR_PAGE_SIZES = [50, 100, 500]
+
+# How long a scraped /metrics snapshot is reused by the dashboard
+METRICS_CACHE_TTL_SECONDS = 30
+
+METRIC_SAMPLE_PATTERN = re.compile(
+    r"^(?P<metric>[a-zA-Z_:][\w:]*)(?:\{(?P<labels>[^}]*)\})?"
+    r"\s+(?P<value>\S+)(?:\s+(?P<timestamp>\S+))?\s*$",
+    flags=re.MULTILINE,
+)
+LABEL_PAIR_PATTERN = re.compile(r'(\w+)="((?:[^"\\]|\\.)*)"')
+
+# The forecast chart never varies except for its data, so its Vega-Lite spec is
+# written out once instead of being rebuilt and validated through Altair per click
+FORECAST_CHART_SPEC = {
+    "title": "Cash Flow Forecast",
+    "mark": "line",
+    "encoding": {
+        "x": {"field": "ds", "type": "temporal", "title": "Date"},
+        "y": {"field": "y", "type": "quantitative", "title": "Cash Position"},
+        "color": {"value": "steelblue"},
+    },
+}
+
+SUPPLIER_COLUMNS = select(
+    models.Supplier.id,
+    models.Supplier.name,
+    models.Supplier.type,
+    models.Supplier.max_delay_days,
+)
+CREDITOR_COLUMNS = select(
+    models.Creditor.id,
+    models.Creditor.supplier_id,
+    models.Creditor.invoice_date,
+    models.Creditor.due_date,
+    # Cast in the database so rows arrive as floats, not per-row Decimal objects
+    cast(models.Creditor.amount, Float).label("amount"),
+    models.Creditor.aging_days,
+    models.Creditor.status,
+)
+
+
+def table_fingerprint(db, model) -> tuple:
+    """Return a cheap (row count, max id) fingerprint of a table.
+
+    Args:
+        db: Database session.
+        model: ORM model class with an integer ``id`` primary key.
+
+    Returns:
+        tuple: (row_count, max_id) for the model's table.
+    """
+    return tuple(db.execute(select(func.count(model.id), func.max(model.id))).one())
+
+
+@st.cache_data(ttl=TABLE_CACHE_TTL_SECONDS, show_spinner=False)
+def load_suppliers_df(fingerprint: tuple) -> pd.DataFrame:
+    """Load the suppliers table as a DataFrame, cached per table fingerprint.
+
+    Args:
+        fingerprint (tuple): Result of table_fingerprint; only used as the cache key.
+
+    Returns:
+        pd.DataFrame: Suppliers with columns id, name, type, max_delay_days.
+    """
+    with get_db_session() as db:
+        return pd.read_sql(SUPPLIER_COLUMNS, db.connection())
+
+
+@st.cache_data(ttl=TABLE_CACHE_TTL_SECONDS, show_spinner=False)
+def load_creditors_page(fingerprint: tuple, page: int, page_size: int) -> pd.DataFrame:
+    """Load one page of creditors, most aged first, cached per table fingerprint.
+
+    Args:
+        fingerprint (tuple): Result of table_fingerprint; only used as the cache key.
+        page (int): 1-based page number.
+        page_size (int): Number of rows per page.
+
+    Returns:
+        pd.DataFrame: Creditors on the page with amount as float64.
+    """
+    stmt = (
+        CREDITOR_COLUMNS.order_by(models.Creditor.aging_days.desc(), models.Creditor.id)
+        .offset((page - 1) * page_size)
+        .limit(page_size)
+    )
+    with get_db_session() as db:
+        return pd.read_sql(stmt, db.connection(), dtype={"amount": "float64"})
+
+
+def style_aging(df: pd.DataFrame) -> pd.DataFrame:
+    """Build the row colours for the aging creditors table in one pass.
+
+    Rows more than 30 days aged are red and more than 15 days yellow.
+
+    Args:
+        df (pd.DataFrame): Creditors with an 'aging_days' column.
+
+    Returns:
+        pd.DataFrame: CSS strings with the same shape, index and columns as df.
+    """
+    aging = df["aging_days"].to_numpy()
+    row_styles = np.where(
+        aging > 30,
+        "background-color: red",
+        np.where(aging > 15, "background-color: yellow", ""),
+    )
+    return pd.DataFrame(
+        np.broadcast_to(row_styles[:, None], df.shape), index=df.index, columns=df.columns
+    )
+
+
 def fetch_metrics():
     resp = requests.get("http://localhost:8000/metrics")
     resp.raise_for_status()
     return resp.text
 
 def parse_metrics(text):
-    rows = []
-    for line in text.splitlines():
-        if not line or line.startswith('#'):
-            continue
-        parts = line.split()
-        if len(parts) == 2:
-            name_labels, value = parts
-            timestamp = None
-        elif len(parts) == 3:
-            name_labels, value, timestamp = parts
-        else:
-            continue
-        if '{' in name_labels:
-            metric, labels_str = name_labels.split('{', 1)
-            labels_str = labels_str.rstrip('}')
-            labels = {}
-            for pair in labels_str.split(','):
-                k, v = pair.split('=', 1)
-                labels[k] = v.strip('"')
-        else:
-            metric = name_labels
-            labels = {}
-        try:
-            ts = pd.to_datetime(int(timestamp), unit='s') if timestamp else None
-        except:
-            ts = None
-        rows.append({'metric': metric, 'labels': labels, 'value': float(value), 'timestamp': ts})
-    return pd.DataFrame(rows)
+    """Parse a Prometheus text exposition into one row per sample.
+
+    Args:
+        text (str): Body of the /metrics endpoint.
+
+    Returns:
+        pd.DataFrame: Columns metric, labels (dict), value (float) and timestamp.
+    """
+    # One regex pass over the whole body; comment lines never match
+    df = pd.DataFrame(
+        METRIC_SAMPLE_PATTERN.findall(text), columns=["metric", "labels", "value", "timestamp"]
+    )
+    df["labels"] = [dict(LABEL_PAIR_PATTERN.findall(labels)) for labels in df["labels"]]
+    df["value"] = df["value"].astype("float64")
+    df["timestamp"] = pd.to_datetime(pd.to_numeric(df["timestamp"], errors="coerce"), unit="s")
+    return df
+
+
+@st.cache_data(ttl=METRICS_CACHE_TTL_SECONDS, show_spinner=False)
+def get_metrics_df() -> pd.DataFrame:
+    """Fetch and parse the metrics endpoint, cached so widget reruns reuse the frame.
+
+    Returns:
+        pd.DataFrame: Parsed samples as returned by parse_metrics.
+    """
+    return parse_metrics(fetch_metrics())
 
 
 @measure_duration(ui_request_duration_seconds)
@@ -75,11 +194,10 @@ def main():
     view = st.sidebar.selectbox("View", ["Main App", "Performance Dashboard"])
     if view == "Performance Dashboard":
         try:
-            metrics_text = fetch_metrics()
+            df = get_metrics_df()
         except Exception as e:
             st.error(f"Metrics endpoint unreachable: {e}")
             return
-        df = parse_metrics(metrics_text)
         metric_names = df["metric"].unique().tolist()
         selected_metric = st.selectbox("Select metric", metric_names)
         metric_df = df[df["metric"] == selected_metric].sort_values("timestamp")
@@ -102,29 +220,23 @@ def main():
         if st.button("Run ETL"):
             try:
                 run_etl(bank_files, aging_file)
+                # The ETL may update rows in place without changing the fingerprints
+                load_suppliers_df.clear()
+                load_creditors_page.clear()
                 st.success("ETL completed.")
             except Exception as e:
                 logger.exception("UI error", exc_info=e)
                 st.error(f"ETL failed: {e}")
 
+    # One short-lived session per render for the read-only table fingerprints;
+    # writes keep their own sessions so a failed save cannot poison the reads
+    with get_db_session() as db:
+        sup_fingerprint = table_fingerprint(db, models.Supplier)
+        cred_fingerprint = table_fingerprint(db, models.Creditor)
+
     # Supplier Manager
     with st.expander("Supplier Manager"):
-        with get_db_session() as db:
-            # Fetch all suppliers
-            suppliers = db.query(models.Supplier).all()
-
-            # Convert to DataFrame for display
-            sup_df = pd.DataFrame(
-                [
-                    {
-                        "id": s.id,
-                        "name": s.name,
-                        "type": s.type,
-                        "max_delay_days": s.max_delay_days,
-                    }
-                    for s in suppliers
-                ]
-            )
+        sup_df = load_suppliers_df(sup_fingerprint)
 
         # Display editable table
         edited_suppliers = st.data_editor(sup_df, num_rows="dynamic")
@@ -132,27 +244,41 @@ def main():
         # Save changes when button is clicked
         if st.button("Save Suppliers"):
             try:
-                with get_db_session() as db:
-                    for row in edited_suppliers.to_dict(orient="records"):
-                        # Validate row data
-                        if "id" not in row or "type" not in row or "max_delay_days" not in row:
-                            logger.warning(f"Skipping invalid supplier row: {row}")
-                            continue
-
-                        # Get supplier by ID
-                        sup = db.query(models.Supplier).get(row["id"])
-                        if not sup:
-                            logger.warning(f"Supplier with ID {row['id']} not found")
-                            continue
-
-                        # Update fields
-                        sup.type = row["type"]
-                        try:
-                            sup.max_delay_days = int(row["max_delay_days"])
-                        except (ValueError, TypeError):
-                            logger.warning(f"Invalid max_delay_days value: {row['max_delay_days']}")
-                            continue
+                mappings = []
+                for row in edited_suppliers.to_dict(orient="records"):
+                    # Validate row data
+                    if "id" not in row or "type" not in row or "max_delay_days" not in row:
+                        logger.warning(f"Skipping invalid supplier row: {row}")
+                        continue
+                    try:
+                        mapping = {"id": int(row["id"]), "type": row["type"]}
+                    except (ValueError, TypeError):
+                        logger.warning(f"Skipping supplier row without a valid id: {row}")
+                        continue
+                    try:
+                        mapping["max_delay_days"] = int(row["max_delay_days"])
+                    except (ValueError, TypeError):
+                        logger.warning(f"Invalid max_delay_days value: {row['max_delay_days']}")
+                    mappings.append(mapping)
 
+                with get_db_session() as db:
+                    # One lookup for all ids, then a single bulk UPDATE by primary key
+                    existing_ids = set(
+                        db.scalars(
+                            select(models.Supplier.id).where(
+                                models.Supplier.id.in_([m["id"] for m in mappings])
+                            )
+                        )
+                    )
+                    for m in mappings:
+                        if m["id"] not in existing_ids:
+                            logger.warning(f"Supplier with ID {m['id']} not found")
+                    mappings = [m for m in mappings if m["id"] in existing_ids]
+                    if mappings:
+                        db.execute(update(models.Supplier), mappings)
+
+                # Edits keep the fingerprint unchanged, so drop the cached table
+                load_suppliers_df.clear()
                 st.success("Suppliers updated.")
             except Exception as e:
                 logger.exception("Error updating suppliers", exc_info=e)
@@ -160,44 +286,23 @@ def main():
 
     # Aging Creditors
     with st.expander("Aging Creditors"):
-        with get_db_session() as db:
-            # Fetch all creditors
-            creditors = db.query(models.Creditor).all()
-
-            # Convert to DataFrame for display
-            cred_df = pd.DataFrame(
-                [
-                    {
-                        "id": c.id,
-                        "supplier_id": c.supplier_id,
-                        "invoice_date": c.invoice_date,
-                        "due_date": c.due_date,
-                        "amount": float(c.amount),
-                        "aging_days": c.aging_days,
-                        "status": c.status,
-                    }
-                    for c in creditors
-                ]
-            )
-
-        # Define conditional row coloring function
-        def color_rows(row):
-            if row["aging_days"] > 30:
-                return ["background-color: red"] * len(row)
-            elif row["aging_days"] > 15:
-                return ["background-color: yellow"] * len(row)
-            else:
-                return [""] * len(row)
+        # Only one page is queried and styled, so render cost tracks page size
+        page_size = st.selectbox("Rows per page", CREDITOR_PAGE_SIZES)
+        page_count = max(1, -(-cred_fingerprint[0] // page_size))
+        page = st.number_input("Page", min_value=1, max_value=page_count, value=1)
+        cred_df = load_creditors_page(cred_fingerprint, int(page), page_size)
 
         # Display styled dataframe with color coding
         st.subheader("Aging Creditors Table")
-        st.dataframe(cred_df.style.apply(color_rows, axis=1))
+        st.caption(f"Page {page} of {page_count} ({cred_fingerprint[0]} creditors)")
+        st.dataframe(cred_df.style.apply(style_aging, axis=None))
 
     # Rule Editor
     with st.expander("Rule Editor"):
         if st.button("Apply Rules"):
             try:
                 applied, failed = apply_pending_rules()
+                load_suppliers_df.clear()
                 st.success(f"Rules applied: {applied}, failed: {failed}")
             except Exception as e:
                 logger.exception("UI error", exc_info=e)
@@ -220,47 +325,29 @@ def main():
                     # Get historical cash data
                     hist_df = get_historical_net_cash(db)
 
-                    # Get latest forecast
-                    latest = (
-                        db.query(models.Forecast)
-                        .order_by(models.Forecast.run_date.desc())
-                        .first()
-                    )
-
-                    if not latest:
+                    # Latest forecast payload via the run_date index (cached per forecast id)
+                    forecast_data = get_latest_forecast_json(db)
+                    if forecast_data is None:
                         st.warning("No forecast data available. Please run a forecast first.")
                         return
 
-                    # Process forecast data
-                    forecast_data = latest.forecast_json
                     if not forecast_data:
                         st.warning("Empty forecast data in latest forecast.")
                         return
 
                     # Convert to DataFrame
-                    fc_df = pd.DataFrame(forecast_data)
-                    fc_df["ds"] = pd.to_datetime(fc_df["ds"])
+                    fc_df = pd.DataFrame.from_records(forecast_data, columns=["ds", "yhat"])
+                    fc_df["ds"] = pd.to_datetime(fc_df["ds"], format="ISO8601")
 
-                    # Combine historical and forecast data
+                    # Long-format chart data with only the plotted columns. The forecast
+                    # starts after the last historical day, so rows are already in ds order.
                     chart_df = pd.concat(
-                        [
-                            hist_df.rename(columns={"ds": "ds", "y": "y"}),
-                            fc_df.rename(columns={"ds": "ds", "yhat": "y"}),
-                        ]
+                        [hist_df[["ds", "y"]], fc_df.rename(columns={"yhat": "y"})],
+                        ignore_index=True,
                     )
 
-                    # Create and display chart
-                    chart = (
-                        alt.Chart(chart_df)
-                        .mark_line()
-                        .encode(
-                            x=alt.X("ds:T", title="Date"),
-                            y=alt.Y("y:Q", title="Cash Position"),
-                            color=alt.value("steelblue")
-                        )
-                        .properties(title="Cash Flow Forecast")
-                    )
-                    st.altair_chart(chart, use_container_width=True)
+                    # Display chart from the prebuilt Vega-Lite spec
+                    st.vega_lite_chart(chart_df, FORECAST_CHART_SPEC, use_container_width=True)
 
                     # Display forecast data table
                     st.subheader("Forecast Data")
@@ -276,13 +363,16 @@ def main():
             try:
                 plans = generate_payment_plan()
                 st.session_state["plans"] = plans
+                # Build the table and its CSV export once per generation, not per rerun
+                plans_df = pd.DataFrame(plans)
+                st.session_state["plans_df"] = plans_df
+                st.session_state["plans_csv"] = plans_df.to_csv(index=False).encode("utf-8")
                 st.success("Draft plans generated.")
             except Exception as e:
                 logger.exception("UI error", exc_info=e)
                 st.error(f"Generation failed: {e}")
         if "plans" in st.session_state:
-            plans_df = pd.DataFrame(st.session_state["plans"])
-            edited_plans = st.data_editor(plans_df, num_rows="dynamic")
+            edited_plans = st.data_editor(st.session_state["plans_df"], num_rows="dynamic")
             if st.button("Save Plans"):
                 try:
                     with get_db_session() as db:
@@ -295,9 +385,11 @@ def main():
                 except Exception as e:
                     logger.exception("UI error", exc_info=e)
                     st.error(f"Save failed: {e}")
-            csv = pd.DataFrame(st.session_state["plans"]).to_csv(index=False)
             st.download_button(
-                "Download CSV", data=csv, file_name="payment_plans.csv", mime="text/csv"
+                "Download CSV",
+                data=st.session_state["plans_csv"],
+                file_name="payment_plans.csv",
+                mime="text/csv",
             )
 
 
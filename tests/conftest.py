@@ -3,8 +3,12 @@
 import os
 import sys
 import unittest
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from contextlib import nullcontext
+from unittest.mock import create_autospec
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import StaticPool
 
 # Add the project root to the Python path
 sys.path.insert(0, os.path.abspath(os.path.dirname(os.path.dirname(__file__))))
@@ -15,38 +19,116 @@ from src.db.session import get_db_session
 # Use an in-memory SQLite database for tests
 TEST_DATABASE_URL = "sqlite:///:memory:"
 
-# Create test engine and session factory
-test_engine = create_engine(TEST_DATABASE_URL)
-TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=test_engine)
+# One shared connection, so every session sees the same in-memory database
+test_engine = create_engine(
+    TEST_DATABASE_URL,
+    poolclass=StaticPool,
+    connect_args={"check_same_thread": False},
+)
+
+
+# pysqlite manages transactions itself and never emits BEGIN for them, so the
+# outer per-test transaction would not exist and a released SAVEPOINT would
+# commit. Take over transaction control so rollback really discards the test.
+@event.listens_for(test_engine, "connect")
+def _disable_pysqlite_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(test_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+# Sessions join the per-test transaction; their commits only release a SAVEPOINT
+TestSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    expire_on_commit=False,
+    join_transaction_mode="create_savepoint",
+)
+
+
+_tables_created = False
 
 
 def setup_test_db():
-    """Create all tables in the test database."""
-    Base.metadata.create_all(bind=test_engine)
+    """Create all tables in the test database, once per test run."""
+    global _tables_created
+    if not _tables_created:
+        Base.metadata.create_all(bind=test_engine)
+        _tables_created = True
 
 
 def teardown_test_db():
     """Drop all tables from the test database."""
+    global _tables_created
     Base.metadata.drop_all(bind=test_engine)
+    _tables_created = False
+
+
+def mock_db_session(db=None):
+    """Build a context manager standing in for get_db_session().
+
+    Without an argument a Session mock is created. It is specced against Session,
+    so calls to methods a real session does not have fail instead of silently
+    returning a new mock.
+
+    Args:
+        db: Session to yield, such as a BaseTestCase's real test session.
+
+    Returns:
+        tuple: (context manager to use as get_db_session's return value, session).
+    """
+    if db is None:
+        db = create_autospec(Session, instance=True)
+    return nullcontext(db), db
 
 
 class BaseTestCase(unittest.TestCase):
-    """Base test case with database setup and teardown."""
+    """Base test case with database setup and teardown.
+
+    Tables are created once and shared; each test runs inside a transaction
+    that is rolled back afterwards, so no DDL is repeated between tests.
+    """
 
     @classmethod
     def setUpClass(cls):
-        """Set up test database once for the test case."""
+        """Make sure the test database tables exist."""
         setup_test_db()
 
-    @classmethod
-    def tearDownClass(cls):
-        """Tear down test database after all tests."""
-        teardown_test_db()
-
     def setUp(self):
-        """Set up a new database session for each test."""
-        self.db = TestSessionLocal()
+        """Open a session inside a fresh outer transaction for each test."""
+        self.connection = test_engine.connect()
+        self.transaction = self.connection.begin()
+        self.db = TestSessionLocal(bind=self.connection)
 
     def tearDown(self):
-        """Close the database session after each test."""
+        """Close the session and roll back everything the test wrote."""
         self.db.close()
+        self.transaction.rollback()
+        self.connection.close()
+
+
+def pytest_addoption(parser):
+    """Register the opt-in flag for end-to-end tests."""
+    parser.addoption(
+        "--run-e2e",
+        action="store_true",
+        default=False,
+        help="run end-to-end tests that start the docker-compose stack",
+    )
+
+
+def pytest_configure(config):
+    """Register the e2e marker."""
+    config.addinivalue_line(
+        "markers", "e2e: end-to-end test against docker-compose; needs --run-e2e"
+    )
+
+
+def pytest_ignore_collect(collection_path, config):
+    """Do not even import the end-to-end module unless --run-e2e was given."""
+    if collection_path.name == "test_end_to_end.py" and not config.getoption("--run-e2e"):
+        return True
+    return None
@@ -1,15 +1,15 @@
 """Unit tests for the ETL module."""
 
 import unittest
-from unittest.mock import patch, MagicMock, mock_open
+from unittest.mock import patch, MagicMock
 import pandas as pd
 from datetime import datetime, date
 import io
 
 # Use unittest directly instead of BaseTestCase
 import unittest
-from src.etl.etl import get_or_create_supplier, ingest_bank_statements, ingest_creditors_aging, run_etl
-from src.db.models import Supplier, Creditor
+from src.etl.etl import ingest_bank_statements, ingest_creditors_aging, run_etl, create_missing_suppliers, PAGE_SIZE, insert_creditors, read_bank_statement_pages
+from tests.conftest import mock_db_session
 
 
 class TestETL(unittest.TestCase):
@@ -32,8 +32,8 @@ Supplier C,2023-01-03,2023-01-25,75.00,3,credit
 """
 
     @patch('src.etl.etl.pd.read_csv')
-    @patch('src.etl.etl.get_or_create_supplier')
-    def test_ingest_bank_statements(self, mock_get_supplier, mock_read_csv):
+    @patch('src.etl.etl.load_supplier_cache')
+    def test_ingest_bank_statements(self, mock_load_cache, mock_read_csv):
         """Test that ingest_bank_statements correctly processes bank statement CSVs."""
         # Set up mocks
         mock_db = MagicMock()
@@ -44,28 +44,26 @@ Supplier C,2023-01-03,2023-01-25,75.00,3,credit
             'amount': [100.0, -50.0],
             'supplier': ['Supplier A', 'Supplier B']
         })
-        mock_read_csv.return_value = mock_df
+        mock_read_csv.side_effect = [mock_df.head(0), iter([mock_df])]  # Header probe, then pages
 
-        # Mock supplier creation
-        mock_supplier = MagicMock()
-        mock_supplier.id = 1
-        mock_get_supplier.return_value = mock_supplier
-
-        # Mock the query to check for existing records
-        mock_db.query.return_value.filter_by.return_value.first.return_value = None
+        # Mock the supplier cache so no suppliers need creating
+        mock_load_cache.return_value = {'Supplier A': 1, 'Supplier B': 2}
 
         # Call the function
         result = ingest_bank_statements(mock_db, ['bank.csv'])
 
         # Assertions
         self.assertEqual(result, 2)  # Should insert 2 records
-        mock_read_csv.assert_called_once_with('bank.csv')
-        self.assertEqual(mock_db.add.call_count, 2)
+        mock_read_csv.assert_any_call('bank.csv', nrows=0)
+        self.assertEqual(mock_read_csv.call_args.kwargs['chunksize'], PAGE_SIZE)
+        batches = [c.args[1] for c in mock_db.execute.call_args_list if isinstance(c.args[-1], list)]
+        self.assertEqual(len(batches), 1)  # Single bulk insert batch
+        self.assertEqual(len(batches[0]), 2)
         mock_db.commit.assert_called_once()
 
     @patch('src.etl.etl.pd.read_csv')
-    @patch('src.etl.etl.get_or_create_supplier')
-    def test_ingest_creditors_aging(self, mock_get_supplier, mock_read_csv):
+    @patch('src.etl.etl.load_supplier_cache')
+    def test_ingest_creditors_aging(self, mock_load_cache, mock_read_csv):
         """Test that ingest_creditors_aging correctly processes aging CSV."""
         # Set up mocks
         mock_db = MagicMock()
@@ -79,15 +77,10 @@ Supplier C,2023-01-03,2023-01-25,75.00,3,credit
             'aging_days': [5, 4],
             'status': ['credit', 'payment']
         })
-        mock_read_csv.return_value = mock_df
-
-        # Mock supplier creation
-        mock_supplier = MagicMock()
-        mock_supplier.id = 1
-        mock_get_supplier.return_value = mock_supplier
+        mock_read_csv.side_effect = [mock_df.head(0), iter([mock_df])]  # Header probe, then pages
 
-        # Mock the query to check for existing records
-        mock_db.query.return_value.filter_by.return_value.first.return_value = None
+        # Mock the supplier cache so no suppliers need creating
+        mock_load_cache.return_value = {'Supplier A': 1, 'Supplier B': 2}
 
         # Call the function
         inserted, updated = ingest_creditors_aging(mock_db, 'aging.csv')
@@ -95,8 +88,11 @@ Supplier C,2023-01-03,2023-01-25,75.00,3,credit
         # Assertions
         self.assertEqual(inserted, 2)  # Should insert 2 records
         self.assertEqual(updated, 0)  # No updates
-        mock_read_csv.assert_called_once_with('aging.csv')
-        self.assertEqual(mock_db.add.call_count, 2)
+        mock_read_csv.assert_any_call('aging.csv', nrows=0)
+        self.assertEqual(mock_read_csv.call_args.kwargs['chunksize'], PAGE_SIZE)
+        batches = [c.args[1] for c in mock_db.execute.call_args_list if isinstance(c.args[-1], list)]
+        self.assertEqual(len(batches), 1)  # Single bulk insert batch
+        self.assertEqual(len(batches[0]), 2)
         mock_db.commit.assert_called_once()
 
     @patch('src.etl.etl.get_db_session')
@@ -105,10 +101,7 @@ Supplier C,2023-01-03,2023-01-25,75.00,3,credit
     def test_run_etl(self, mock_ingest_aging, mock_ingest_bank, mock_get_db_session):
         """Test that run_etl correctly calls the component functions."""
         # Set up mocks
-        mock_db = MagicMock()
-        mock_session = MagicMock()
-        mock_session.__enter__.return_value = mock_db
-        mock_get_db_session.return_value = mock_session
+        mock_get_db_session.return_value, mock_db = mock_db_session()
 
         mock_ingest_bank.return_value = 2
         mock_ingest_aging.return_value = (3, 1)
@@ -120,6 +113,45 @@ Supplier C,2023-01-03,2023-01-25,75.00,3,credit
         mock_ingest_bank.assert_called_once_with(mock_db, ['bank1.csv', 'bank2.csv'])
         mock_ingest_aging.assert_called_once_with(mock_db, 'aging.csv')
 
+    def test_create_missing_suppliers(self):
+        """Test that only unknown suppliers are inserted, in a single batch."""
+        mock_db = MagicMock()
+        mock_db.execute.return_value.tuples.return_value.all.return_value = [('Supplier B', 2)]
+        cache = {'Supplier A': 1}
+
+        create_missing_suppliers(mock_db, cache, ['Supplier A', 'Supplier B', 'Supplier B'])
+
+        mock_db.execute.assert_called_once()
+        rows = mock_db.execute.call_args.args[1]
+        self.assertEqual([row['name'] for row in rows], ['Supplier B'])
+        self.assertEqual(cache, {'Supplier A': 1, 'Supplier B': 2})
+
+    def test_insert_creditors_uses_copy_on_postgres(self):
+        """Test that new creditors are streamed through COPY on psycopg2."""
+        mock_db = MagicMock()
+        mock_db.get_bind.return_value.dialect.name = 'postgresql'
+        mock_db.get_bind.return_value.dialect.driver = 'psycopg2'
+        mock_cursor = mock_db.connection.return_value.connection.cursor.return_value
+        rows = [{
+            'supplier_id': 1, 'invoice_date': date(2023, 1, 1), 'due_date': date(2023, 1, 1),
+            'amount': 100.0, 'aging_days': 5, 'status': 'credit',
+        }]
+
+        insert_creditors(mock_db, rows)
+
+        sql, buffer = mock_cursor.copy_expert.call_args.args
+        self.assertTrue(sql.startswith('COPY creditors (supplier_id, invoice_date'))
+        self.assertEqual(buffer.getvalue(), '1,2023-01-01,2023-01-01,100.0,5,credit\n')
+        mock_db.execute.assert_not_called()
+
+    def test_read_bank_statement_pages_from_upload_buffer(self):
+        """Test that an uploaded buffer is rewound after the header probe."""
+        buffer = io.BytesIO(self.bank_csv_content.encode())
+
+        pages = list(read_bank_statement_pages(buffer, pd.Timestamp('2023-02-01')))
+
+        self.assertEqual(sum(len(page) for page in pages), 4)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,70 @@
+"""Unit tests for the Prophet model cache."""
+
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import pandas as pd
+
+from src.forecast.cache import cache_key, fit_prophet
+
+
+class TestProphetCache(unittest.TestCase):
+    """Test cases for the Prophet model cache."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.hist_df = pd.DataFrame({
+            'ds': pd.date_range(start='2023-01-01', periods=10),
+            'y': [100.0, 110, 90, 95, 105, 115, 100, 90, 110, 120]
+        })
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+
+    def test_cache_key_tracks_history(self):
+        """Test that the key changes with the data and not with the index."""
+        key = cache_key(self.hist_df)
+
+        self.assertEqual(key, cache_key(self.hist_df.set_axis(range(10, 20))))
+        changed = self.hist_df.assign(y=self.hist_df['y'] + 1)
+        self.assertNotEqual(key, cache_key(changed))
+
+    @patch('src.forecast.cache.model_from_json')
+    @patch('src.forecast.cache.model_to_json', return_value='{}')
+    @patch('src.forecast.cache.Prophet')
+    def test_fit_prophet_reuses_cached_model(self, mock_prophet, mock_to_json, mock_from_json):
+        """Test that a second fit on the same history loads the cached model."""
+        mock_from_json.return_value = MagicMock(name='cached_model')
+
+        with patch('src.forecast.cache.CACHE_DIR', self.tmpdir.name):
+            first = fit_prophet(self.hist_df)
+            second = fit_prophet(self.hist_df)
+
+        mock_prophet.return_value.fit.assert_called_once_with(self.hist_df)
+        self.assertIs(first, mock_prophet.return_value)
+        self.assertIs(second, mock_from_json.return_value)
+        mock_from_json.assert_called_once_with('{}')
+
+    @patch('src.forecast.cache.CACHE_MAX_ENTRIES', 2)
+    @patch('src.forecast.cache.model_to_json', return_value='{}')
+    @patch('src.forecast.cache.Prophet')
+    def test_fit_prophet_prunes_oldest_models(self, mock_prophet, mock_to_json):
+        """Test that writing a new model keeps only the newest CACHE_MAX_ENTRIES files."""
+        for age, name in enumerate(['newer', 'older', 'oldest'], start=1):
+            path = os.path.join(self.tmpdir.name, f'{name}.json')
+            with open(path, 'w') as f:
+                f.write('{}')
+            os.utime(path, (1_000_000 - age, 1_000_000 - age))
+
+        with patch('src.forecast.cache.CACHE_DIR', self.tmpdir.name):
+            fit_prophet(self.hist_df)
+
+        self.assertEqual(
+            sorted(os.listdir(self.tmpdir.name)),
+            sorted([f'{cache_key(self.hist_df)}.json', 'newer.json']),
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
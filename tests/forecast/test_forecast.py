@@ -7,8 +7,12 @@ from datetime import datetime, date
 
 # Use unittest directly instead of BaseTestCase
 import unittest
-from src.forecast.forecast import train_and_forecast, run_forecast
-from src.db.models import Forecast as ForecastModel
+from src.forecast.forecast import (
+    train_and_forecast, run_forecast, get_historical_net_cash, save_forecast
+)
+from src.forecast.fast_forecast import forecast_daily
+from src.db.models import Forecast as ForecastModel, Supplier, Creditor
+from tests.conftest import BaseTestCase, mock_db_session
 
 
 class TestForecast(unittest.TestCase):
@@ -70,6 +74,112 @@ class TestForecast(unittest.TestCase):
             self.assertEqual(len(result), 14)
             self.assertTrue(all('ds' in item and 'yhat' in item for item in result))
 
+    @patch('src.forecast.forecast.forecast_daily')
+    @patch('src.forecast.forecast.get_historical_net_cash')
+    @patch('src.forecast.forecast.get_db_session')
+    def test_run_forecast_weekly_means(self, mock_get_db_session, mock_hist, mock_forecast_daily):
+        """Test that days beyond the first 14 are averaged per Monday-based week."""
+        mock_get_db_session.return_value, _ = mock_db_session()
+        mock_hist.return_value = self.sample_data
+        # 2023-01-11 is a Wednesday; days 15-21 span 2023-01-25 .. 2023-01-31
+        mock_forecast_daily.return_value = pd.DataFrame({
+            'ds': pd.date_range(start='2023-01-11', periods=21),
+            'yhat': [float(i) for i in range(21)],
+        })
+
+        result = run_forecast(horizon_days=21)
+
+        self.assertEqual(len(result), 16)
+        self.assertDictEqual(result[0], {'ds': '2023-01-11', 'yhat': 0.0})
+        self.assertDictEqual(result[14], {'ds': '2023-01-23', 'yhat': 16.0})
+        self.assertDictEqual(result[15], {'ds': '2023-01-30', 'yhat': 19.5})
+
+    @patch('src.forecast.forecast.fit_prophet')
+    @patch('src.forecast.forecast.get_historical_net_cash')
+    @patch('src.forecast.forecast.get_db_session')
+    def test_run_forecast_short_history_skips_prophet(self, mock_get_db_session, mock_hist, mock_fit):
+        """Test that fewer than two weeks of history use the fast forecaster."""
+        mock_get_db_session.return_value, mock_db = mock_db_session()
+        mock_hist.return_value = self.sample_data
+
+        result = run_forecast(horizon_days=7, use_prophet=True)
+
+        mock_fit.assert_not_called()
+        self.assertEqual(len(result), 7)
+        self.assertEqual(result[0]['ds'], '2023-01-11')
+        mock_db.add.assert_called_once()
+
+    @patch('src.forecast.forecast.get_db_session')
+    def test_save_forecast_reuses_session(self, mock_get_db_session):
+        """Test that save_forecast adds to a provided session without opening another."""
+        _, mock_db = mock_db_session()
+        df = pd.DataFrame({'ds': pd.date_range(start='2023-01-11', periods=2), 'yhat': [1, 2]})
+
+        save_forecast(df, horizon_days=2, db=mock_db)
+
+        mock_get_db_session.assert_not_called()
+        record = mock_db.add.call_args.args[0]
+        self.assertIsInstance(record, ForecastModel)
+        self.assertEqual(record.forecast_json, [
+            {'ds': '2023-01-11', 'yhat': 1.0},
+            {'ds': '2023-01-12', 'yhat': 2.0},
+        ])
+
+    def test_forecast_daily(self):
+        """Test that forecast_daily continues a linear trend over future days."""
+        hist = pd.DataFrame({
+            'ds': pd.date_range(start='2023-01-01', periods=28).date,
+            'y': [10.0 * i for i in range(28)],
+        })
+
+        result = forecast_daily(hist, horizon_days=5, gamma=0.0)
+
+        self.assertListEqual(list(result.columns), ['ds', 'yhat'])
+        self.assertEqual(result['ds'].iloc[0], pd.Timestamp('2023-01-29'))
+        self.assertEqual(len(result), 5)
+        self.assertTrue((result['yhat'].diff().dropna() > 0).all())
+
+    def test_forecast_daily_fills_missing_days(self):
+        """Test that forecast_daily handles gaps and very short histories."""
+        hist = pd.DataFrame({
+            'ds': [date(2023, 1, 1), date(2023, 1, 4)],
+            'y': [100.0, 100.0],
+        })
+
+        result = forecast_daily(hist, horizon_days=3)
+
+        self.assertEqual(result['ds'].iloc[0], pd.Timestamp('2023-01-05'))
+        self.assertEqual(len(result), 3)
+
+
+class TestHistoricalNetCash(BaseTestCase):
+    """Test cases for the net-cash aggregation query."""
+
+    def test_get_historical_net_cash(self):
+        """Test that credits and payments net per day, including one-sided days."""
+        supplier = Supplier(name='Supplier A', type='core', max_delay_days=30)
+        self.db.add(supplier)
+        self.db.flush()
+        for invoice_date, amount, status in [
+            (date(2023, 1, 2), 50, 'payment'),
+            (date(2023, 1, 1), 100, 'credit'),
+            (date(2023, 1, 2), 80, 'credit'),
+            (date(2023, 1, 3), 30, 'payment'),
+        ]:
+            self.db.add(Creditor(
+                supplier_id=supplier.id, invoice_date=invoice_date,
+                due_date=invoice_date, amount=amount, aging_days=0, status=status,
+            ))
+        self.db.flush()
+
+        result = get_historical_net_cash(self.db)
+
+        self.assertListEqual(
+            list(result['ds']), list(pd.date_range('2023-01-01', periods=3))
+        )
+        self.assertTrue(pd.api.types.is_datetime64_any_dtype(result['ds']))
+        self.assertListEqual(list(result['y']), [100.0, 30.0, -30.0])
+
 
 if __name__ == '__main__':
     unittest.main()